@@ -0,0 +1,790 @@
+"""Performance benchmarks for the student management system.
+
+Run ``python benchmarks.py <name>`` to run one benchmark, or with no
+arguments to run them all. Benchmarks use the local MySQL server from
+``module_database.DB_CONFIG`` when it is reachable and fall back to an
+SQLite file as a stand-in otherwise.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import module_database
+
+
+def _mysql_available():
+    try:
+        import mysql.connector
+        mysql.connector.connect(**module_database.DB_CONFIG).close()
+        return True
+    except Exception:
+        return False
+
+
+def _sqlite_standin():
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    sqlite3.connect(path).close()
+    return sqlite3.connect, {"database": path}
+
+
+def _calls_per_sec(fn, duration):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def bench_pool(duration=2.0):
+    """Compare calls/sec of a trivial query with and without connection pooling."""
+    if _mysql_available():
+        import mysql.connector
+        backend, connect, config = "mysql", mysql.connector.connect, dict(module_database.DB_CONFIG)
+    else:
+        backend = "sqlite stand-in"
+        connect, config = _sqlite_standin()
+
+    def unpooled():
+        conn = connect(**config)
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+    pool = module_database.ConnectionPool(size=1, connect=connect, **config)
+
+    def pooled():
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+
+    without = _calls_per_sec(unpooled, duration)
+    with_pool = _calls_per_sec(pooled, duration)
+    pool.close()
+    print(f"[pool] backend={backend}")
+    print(f"  without pool: {without:10.0f} calls/sec")
+    print(f"  with pool:    {with_pool:10.0f} calls/sec  ({with_pool / without:.1f}x)")
+
+
+BENCH_ROLL_NO_START = 900_000_000  # benchmark rows live far above real roll numbers
+
+
+def _synthetic_rows(count, start=BENCH_ROLL_NO_START):
+    for i in range(count):
+        yield (f"Student {i}", start + i, f"student{i}@gmail.com", "Male" if i % 2 else "Female",
+               f"9{i:09d}", f"{1990 + i % 20}-{1 + i % 12:02d}-{1 + i % 28:02d}", f"{i} Main Street")
+
+
+def bench_bulk(rows=100_000, batch_size=module_database.BULK_BATCH_SIZE):
+    """Measure bulk import/export throughput in rows/sec."""
+    path = os.path.join(tempfile.mkdtemp(), "students.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(module_database.STUDENT_COLUMNS)
+        writer.writerows(_synthetic_rows(rows))
+
+    start = time.perf_counter()
+    valid = 0
+    for _, record in module_database.read_student_records(path):
+        module_database.validate_student_record(record)
+        valid += 1
+    elapsed = time.perf_counter() - start
+    print(f"[bulk] {rows} rows, batch_size={batch_size}")
+    print(f"  parse + validate: {valid / elapsed:10.0f} rows/sec")
+
+    if not _mysql_available():
+        print("  import/export:    skipped (MySQL not reachable)")
+        return
+    start = time.perf_counter()
+    inserted, errors = module_database.import_students(path, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"  import:           {inserted / elapsed:10.0f} rows/sec ({len(errors)} errors)")
+    start = time.perf_counter()
+    exported = module_database.export_students(path + ".out.jsonl", batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"  export:           {exported / elapsed:10.0f} rows/sec")
+    with module_database.get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM students WHERE roll_no >= %s", (BENCH_ROLL_NO_START,))
+        conn.commit()
+        cursor.close()
+
+
+def bench_tree(sizes=(1_000, 10_000, 100_000, 1_000_000), mutations=200):
+    """Compare the latency of reflecting one add/update/delete in the student
+    tree by patching the row in place versus reloading every row."""
+    import tkinter as tk
+    from tkinter import ttk
+    from module_tree import StudentRows
+    try:
+        root = tk.Tk()
+    except tk.TclError as err:
+        print(f"[tree] skipped: {err}")
+        return
+    tree = ttk.Treeview(root, columns=module_database.STUDENT_COLUMNS, show="headings")
+    rows_view = StudentRows(tree)
+    print(f"[tree] mean latency per mutation ({mutations} mutations)")
+    for size in sizes:
+        rows = list(_synthetic_rows(size, start=0))
+        # leave every other roll_no free so adds land inside the listing
+        rows = [row[:1] + (row[1] * 2,) + row[2:] for row in rows]
+        rows_view.replace(rows)
+        root.update()
+
+        start = time.perf_counter()
+        for i in range(mutations):
+            roll_no = (i * size // mutations) * 2 + 1
+            row = ("Added", roll_no) + rows[0][2:]
+            rows_view.upsert(row)
+            rows_view.upsert(("Updated",) + row[1:])
+            rows_view.remove(roll_no)
+        patched = (time.perf_counter() - start) / (mutations * 3)
+
+        start = time.perf_counter()
+        rows_view.replace(rows)
+        reload = time.perf_counter() - start
+        print(f"  {size:>9} rows: in place {patched * 1e6:8.1f} us   full reload {reload * 1e3:10.1f} ms")
+    root.destroy()
+
+
+def _load_test(port, path, clients, duration):
+    """Hammer ``path`` from ``clients`` keep-alive connections; returns requests/sec."""
+    import http.client
+    counts = [0] * clients
+    errors = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            counts[i] += 1
+            errors[i] += response.status >= 400
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start), sum(errors)
+
+
+def bench_server(clients=(1, 10, 50), duration=2.0):
+    """Load-test the headless API in requests/sec."""
+    from module_server import make_server
+    server = make_server(port=0)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    paths = ["/health"]
+    if _mysql_available():
+        paths += ["/students?limit=50", "/students/search?column=name&q=Student"]
+    print(f"[server] {duration:.0f}s per run")
+    for path in paths:
+        for count in clients:
+            rate, errors = _load_test(port, path, count, duration)
+            print(f"  {path:45} {count:3} clients: {rate:10.0f} req/sec ({errors} errors)")
+    if len(paths) == 1:
+        print("  student endpoints skipped (MySQL not reachable)")
+    server.shutdown()
+    server.server_close()
+
+
+def bench_async(concurrency=(1, 10, 100), requests_per_client=50):
+    """Compare search throughput of the sync (thread per client) and asyncio
+    database paths at several levels of concurrency."""
+    if not _mysql_available():
+        print("[async] skipped (MySQL not reachable)")
+        return
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    import module_async_database
+
+    def sync_client(i):
+        for j in range(requests_per_client):
+            module_database.find_students("name", f"Student {i * j % 1000}", use_cache=False)
+
+    async def async_run(clients):
+        async def client(i):
+            for j in range(requests_per_client):
+                await module_async_database.async_find_students("name", f"Student {i * j % 1000}")
+        await module_async_database.get_async_pool()
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        await module_async_database.close_async_pool()
+        return elapsed
+
+    print(f"[async] name searches, {requests_per_client} per client")
+    for clients in concurrency:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as executor:
+            list(executor.map(sync_client, range(clients)))
+        sync_elapsed = time.perf_counter() - start
+        async_elapsed = asyncio.run(async_run(clients))
+        total = clients * requests_per_client
+        print(f"  {clients:3} clients: sync {total / sync_elapsed:8.0f} q/sec   async {total / async_elapsed:8.0f} q/sec")
+
+
+def bench_validate(rows=1_000_000):
+    """Compare per-row validate_email/validate_contact calls with the batch API."""
+    import module_validate
+    # roughly 5% of each column invalid, as in a real intake
+    emails = [f"student{i}@{('gmail', 'yahoo', 'outlook')[i % 3]}.{'org' if i % 20 == 0 else 'com'}"
+              for i in range(rows)]
+    contacts = [f"98765x{i}" if i % 20 == 0 else f"9{i:09d}" for i in range(rows)]
+
+    def scalar_email(email):
+        try:
+            return module_validate.validate_email(email)
+        except ValueError:
+            return False
+
+    print(f"[validate] {rows} rows")
+    start = time.perf_counter()
+    expected_emails = [scalar_email(email) for email in emails]
+    expected_contacts = [module_validate.validate_contact(no) for no in contacts]
+    scalar = time.perf_counter() - start
+    print(f"  scalar loop:   {scalar:6.2f} s")
+
+    start = time.perf_counter()
+    email_mask, _ = module_validate.validate_emails(emails)
+    contact_mask, _ = module_validate.validate_contacts(contacts)
+    batch = time.perf_counter() - start
+    assert email_mask == expected_emails and contact_mask == expected_contacts
+    print(f"  batch (lists): {batch:6.2f} s  ({scalar / batch:.1f}x)")
+
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    email_array, contact_array = np.array(emails), np.array(contacts)
+    start = time.perf_counter()
+    email_mask, _ = module_validate.validate_emails(email_array)
+    contact_mask, _ = module_validate.validate_contacts(contact_array)
+    batch = time.perf_counter() - start
+    assert email_mask.tolist() == expected_emails and contact_mask.tolist() == expected_contacts
+    print(f"  batch (numpy): {batch:6.2f} s  ({scalar / batch:.1f}x)")
+
+
+def bench_backends(rows=10_000, duration=1.0):
+    """Compare add/search/page throughput of the storage backends."""
+    import module_storage
+    from datetime import date
+    backends = [module_storage.SQLiteBackend(os.path.join(tempfile.mkdtemp(), "students.db"))]
+    if _mysql_available():
+        backends.append(module_storage.MySQLBackend())
+    print(f"[backends] {rows} rows, {duration:.0f}s per query")
+    for backend in backends:
+        backend.setup()
+        data = [row[:5] + (date.fromisoformat(row[5]),) + row[6:] for row in _synthetic_rows(rows)]
+        start = time.perf_counter()
+        for row in data:
+            backend.add(row)
+        adds = rows / (time.perf_counter() - start)
+        names = iter(range(10**9))
+        queries = {
+            "search name substring": lambda: backend.search("name", f"nt {next(names) % rows}", "substring"),
+            "search email prefix": lambda: backend.search("email", f"student{next(names) % rows}", "prefix"),
+            "page": lambda: backend.fetch_page(BENCH_ROLL_NO_START + next(names) % rows, 50),
+        }
+        print(f"  {backend.name}: add {adds:10.0f} rows/sec")
+        for label, query in queries.items():
+            print(f"  {backend.name}: {label:22} {_calls_per_sec(query, duration):10.0f} queries/sec")
+        for row in data:
+            backend.delete(row[1])
+        backend.close()
+
+
+def bench_metrics(calls=1_000_000):
+    """Measure the per-call cost of metrics.timed() when disabled and enabled."""
+    from module_metrics import Metrics
+    print(f"[metrics] {calls} timed blocks")
+    for enabled in (False, True):
+        recorder = Metrics(enabled=enabled, slow_query_threshold=None)
+        start = time.perf_counter()
+        for _ in range(calls):
+            with recorder.timed("Search") as timer:
+                timer.rows = 1
+        per_call = (time.perf_counter() - start) / calls
+        print(f"  {'enabled' if enabled else 'disabled':8}: {per_call * 1e9:8.0f} ns/call")
+
+
+def bench_live_search(rows=100_000, names=50):
+    """Type names one keystroke at a time and compare database round trips
+    and latency per keystroke with and without local narrowing."""
+    import module_storage
+    from module_live_search import LiveSearch
+
+    class InlineRunner:
+        """Runs each search on the calling thread so its latency can be timed."""
+        def submit(self, fn, *args, on_success=None, on_error=None, channel=None):
+            on_success(fn(*args))
+
+    backend = module_storage.configure_backend("sqlite", path=os.path.join(tempfile.mkdtemp(), "students.db"))
+    backend.setup()
+    for row in _synthetic_rows(rows):
+        backend.add(row)
+    queries = [f"Student {i * rows // names}" for i in range(names)]
+    print(f"[live_search] {rows} rows, typing {names} names")
+    for narrowing in (False, True):
+        search = LiveSearch(None, InlineRunner(), on_results=lambda rows: None)
+        keystrokes = 0
+        start = time.perf_counter()
+        for query in queries:
+            search.reset()
+            for end in range(1, len(query) + 1):
+                if not narrowing:
+                    search.reset()
+                search.search_now("name", query[:end])
+                keystrokes += 1
+        per_key = (time.perf_counter() - start) / keystrokes
+        print(f"  {'narrowing' if narrowing else 'every key':9}: {search.round_trips:5} round trips "
+              f"for {keystrokes} keystrokes, {per_key * 1e3:6.2f} ms/keystroke")
+    backend.close()
+    module_storage._backend = None
+
+
+def _fetched_rows(count):
+    """Rows shaped like a driver returns them: fresh strings, int and date per row."""
+    from datetime import date
+    for row in _synthetic_rows(count, start=0):
+        yield row[:3] + (row[3].encode().decode(),) + row[4:5] + (date.fromisoformat(row[5]),) + row[6:]
+
+
+def bench_memory(sizes=(100_000, 1_000_000)):
+    """Compare memory held by tuples, Student objects and a StudentStore (tracemalloc)."""
+    import gc
+    import tracemalloc
+    from module_records import Student, StudentStore
+    layouts = {
+        "tuples": list,
+        "Student objects": lambda rows: [Student.from_row(row) for row in rows],
+        "StudentStore": StudentStore,
+    }
+    print("[memory] bytes held after loading")
+    for size in sizes:
+        for label, build in layouts.items():
+            gc.collect()
+            tracemalloc.start()
+            held = build(_fetched_rows(size))
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del held
+            print(f"  {size:>9} rows  {label:16} {current / 2**20:8.1f} MiB  ({current / size:5.0f} B/row)")
+
+
+_FIRST_PAINT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {repo!r})
+try:
+    import module_gui
+except Exception as err:
+    print("skipped", err)
+    raise SystemExit
+module_gui.start()
+print(time.time())
+"""
+
+
+def bench_startup(runs=5):
+    """Measure GUI start-up: import time (-X importtime) and time to first paint."""
+    import subprocess
+    import sys
+    repo = os.path.dirname(os.path.abspath(__file__))
+    modules = "module_main, module_service, module_tasks, module_live_search, module_tree, tkinter.ttk"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+                            cwd=repo, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith("  "):
+            imports.append((int(fields[1]), fields[2].strip()))
+    print("[startup] slowest top-level imports (-X importtime)")
+    for cumulative, name in sorted(imports, reverse=True)[:8]:
+        print(f"  {name:24} {cumulative / 1000:7.1f} ms")
+    print(f"  total                    {sum(cumulative for cumulative, _ in imports) / 1000:7.1f} ms")
+
+    env = dict(os.environ, STUDENTS_BACKEND="sqlite")
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        output = subprocess.run([sys.executable, "-c", _FIRST_PAINT_SCRIPT.format(repo=repo)], cwd=tempfile.mkdtemp(),
+                                env=env, capture_output=True, text=True, timeout=60).stdout.strip()
+        if not output or output.startswith("skipped"):
+            print(f"  time to first paint: {output or 'skipped (GUI did not start)'}")
+            return
+        times.append(float(output.splitlines()[-1]) - start)
+    print(f"  time to first paint: best {min(times) * 1000:.0f} ms, mean {sum(times) / len(times) * 1000:.0f} ms "
+          f"over {runs} runs")
+
+
+E2E_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def _latency_summary(latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    return {"ops": len(latencies), "ops_per_sec": len(latencies) / total if total else None,
+            "p50_ms": percentile(50), "p95_ms": percentile(95), "p99_ms": percentile(99)}
+
+
+def _timed_calls(fn, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return _latency_summary(latencies)
+
+
+def _e2e_backends():
+    """Yield ``(name, backend)`` pairs to run the end-to-end suite against, each on an empty table."""
+    import module_storage
+    yield "sqlite", module_storage.configure_backend(
+        "sqlite", path=os.path.join(tempfile.mkdtemp(), "students.db"))
+    if _mysql_available():
+        yield "mysql", module_storage.configure_backend("mysql")
+
+
+def _remove_bench_rows(name):
+    """Delete the benchmark's rows from MySQL, which may also hold real students."""
+    if name != "mysql":
+        return
+    with module_database.get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM students WHERE roll_no >= %s", (BENCH_ROLL_NO_START,))
+        conn.commit()
+        cursor.close()
+
+
+def bench_e2e(sizes=E2E_SIZES, ops=200, seed=0):
+    """Run GetAll, every search criterion and Add/Update/Delete through
+    module_service against tables of synthetic students.
+
+    Returns the results (also written by ``--json``) keyed by backend and size.
+    """
+    import random
+    import module_service
+    import module_storage
+    from module_synthetic import generate_students
+
+    results = {}
+    for size in sizes:
+        for name, backend in _e2e_backends():
+            backend.setup()
+            # MySQL may hold real students, so benchmark rows get their own roll_no range
+            start_roll_no = BENCH_ROLL_NO_START if name == "mysql" else 1
+            start = time.perf_counter()
+            loaded = backend.add_many(generate_students(size, seed, start_roll_no))
+            load_seconds = time.perf_counter() - start
+            rng = random.Random(seed)
+            sample = list(generate_students(min(size, 10_000), seed, start_roll_no))
+            picks = [rng.choice(sample) for _ in range(ops)]
+            module_database.query_cache.clear()
+            result = {"load": {"rows": loaded, "rows_per_sec": loaded / load_seconds}}
+
+            start = time.perf_counter()
+            after, pages, listed = None, 0, 0
+            while True:
+                rows = module_service.list_students(after)
+                pages += 1
+                listed += len(rows)
+                if len(rows) < module_service.PAGE_SIZE:
+                    break
+                after = rows[-1][1]
+            elapsed = time.perf_counter() - start
+            result["GetAll"] = {"rows": listed, "pages": pages, "rows_per_sec": listed / elapsed}
+
+            search_args = {
+                "roll_no": [("roll_no", str(row[1])) for row in picks],
+                "name": [("name", row[0].split()[1][:4]) for row in picks],
+                "dob": [("dob", row[5].isoformat()) for row in picks],
+                "email": [("email", row[2][:6]) for row in picks],
+                "gender": [("gender", row[3]) for row in picks],
+            }
+            for column in module_service.SEARCH_MODES:
+                result[f"Search:{column}"] = _timed_calls(module_service.search_students, search_args[column])
+
+            new_rows = list(generate_students(ops, seed + 1, start_roll_no + size))
+            records = [dict(zip(module_database.STUDENT_COLUMNS, map(str, row))) for row in new_rows]
+            result["Add"] = _timed_calls(module_service.add_student, [(record,) for record in records])
+            result["Update"] = _timed_calls(module_service.update_student,
+                                            [(dict(record, address="1 New Road"),) for record in records])
+            result["Delete"] = _timed_calls(module_service.delete_student, [(row[1],) for row in new_rows])
+
+            _remove_bench_rows(name)
+            backend.close()
+            module_storage._backend = None
+
+            print(f"[e2e] {name} {size} rows: load {result['load']['rows_per_sec']:.0f} rows/sec, "
+                  f"GetAll {result['GetAll']['rows_per_sec']:.0f} rows/sec")
+            for op, stats in result.items():
+                if "p50_ms" in stats:
+                    print(f"  {op:15} {stats['ops_per_sec']:10.0f} ops/sec  p50 {stats['p50_ms']:7.2f} ms  "
+                          f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms")
+            results.setdefault(name, {})[str(size)] = result
+    return results
+
+
+def bench_changes(rows=100_000, edits=(0, 10, 1_000)):
+    """Compare catching up on other clients' edits by a full reload with a change-feed poll."""
+    import module_service
+    from module_change_feed import RELOAD, ChangeFeed
+    from module_synthetic import generate_students
+    print(f"[changes] {rows} rows")
+    for name, backend in _e2e_backends():
+        backend.setup()
+        try:
+            backend.add_many(generate_students(rows, start_roll_no=BENCH_ROLL_NO_START))
+            start = time.perf_counter()
+            after = None
+            while True:
+                page = module_service.list_students(after, module_database.BULK_BATCH_SIZE)
+                if not page:
+                    break
+                after = page[-1][1]
+            print(f"  {name:6} full reload:          {(time.perf_counter() - start) * 1000:9.1f} ms")
+            # No cap, to time reading every change rather than falling back to the reload above
+            feed = ChangeFeed(max_changes=rows)
+            feed.start()
+            for count in edits:
+                for row in generate_students(count, seed=count, start_roll_no=BENCH_ROLL_NO_START):
+                    backend.update(row)
+                start = time.perf_counter()
+                changed = feed.poll()
+                assert changed != RELOAD
+                print(f"  {name:6} poll, {len(changed):5} changed: {(time.perf_counter() - start) * 1000:9.1f} ms")
+        finally:
+            _remove_bench_rows(name)
+
+
+def _offset_page(backend, sort_column, descending, filters, offset):
+    """Fetch the listing page at ``offset`` with LIMIT/OFFSET, for comparison with keyset paging."""
+    import module_storage
+    sqlite = isinstance(backend, module_storage.SQLiteBackend)
+    sql, params = module_database.build_listing_query(
+        sort_column, descending, None, filters,
+        email_domain_sql=module_storage._SQLITE_EMAIL_DOMAIN if sqlite else module_database.EMAIL_DOMAIN_SQL)
+    sql += f" OFFSET {offset}"
+    if sqlite:
+        return backend._query(sql.replace("%s", "?"), params)
+    with module_database.get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+
+def bench_listing(rows=1_000_000, pages=50):
+    """Time sorted, filtered browsing: the first page, and a page ``pages`` deep
+    reached by keyset pagination versus the same page by OFFSET."""
+    import module_service
+    from module_database import listing_key
+    from module_synthetic import generate_students
+    cases = [("name", False, {}), ("dob", True, {}), ("email", False, {"gender": "Female"}),
+             ("name", False, {"gender": "Male", "dob": ("2000-01-01", None), "email_domain": "gmail.com"})]
+    print(f"[listing] {rows} rows, page {pages} deep")
+    for name, backend in _e2e_backends():
+        backend.setup()
+        try:
+            backend.add_many(generate_students(rows, start_roll_no=BENCH_ROLL_NO_START))
+            for sort_column, descending, filters in cases:
+                start = time.perf_counter()
+                page = module_service.browse_students(sort_column, descending, None, filters)
+                first = time.perf_counter() - start
+                for _ in range(pages - 1):
+                    page = module_service.browse_students(sort_column, descending,
+                                                          listing_key(page[-1], sort_column), filters)
+                start = time.perf_counter()
+                module_service.browse_students(sort_column, descending, listing_key(page[-1], sort_column),
+                                               filters)
+                keyset = time.perf_counter() - start
+                start = time.perf_counter()
+                _offset_page(backend, sort_column, descending, module_service.prepare_filters(filters),
+                             pages * module_database.PAGE_SIZE)
+                offset = time.perf_counter() - start
+                label = f"{sort_column}{' desc' if descending else ''} {filters or ''}"
+                print(f"  {name:6} {label:60} first {first * 1000:6.1f} ms  keyset {keyset * 1000:6.1f} ms"
+                      f"  offset {offset * 1000:7.1f} ms")
+        finally:
+            _remove_bench_rows(name)
+
+
+def bench_audit(rows=1_000_000, workers=None):
+    """Audit throughput in rows/sec for 1, 2, 4... worker processes up to the core count."""
+    from module_audit import audit_students
+    from module_synthetic import generate_students
+    cores = os.cpu_count() or 1
+    counts = workers or sorted({1, cores} | {2 ** i for i in range(1, cores.bit_length()) if 2 ** i < cores})
+    print(f"[audit] {rows} rows, {cores} cores")
+    for name, backend in _e2e_backends():
+        backend.setup()
+        try:
+            backend.add_many(generate_students(rows, start_roll_no=BENCH_ROLL_NO_START))
+            report = os.path.join(tempfile.mkdtemp(), "audit.csv")
+            for count in counts:
+                start = time.perf_counter()
+                # the audit reads the whole table, including any real students on MySQL
+                audited = audit_students(report, workers=count)["rows"]
+                elapsed = time.perf_counter() - start
+                print(f"  {name:6} {count:3} workers: {audited / elapsed:10.0f} rows/sec")
+        finally:
+            _remove_bench_rows(name)
+
+
+def bench_writes(writes=5_000, batch_sizes=(1, 10, 100)):
+    """Compare adds/sec committed one at a time with the write-behind queue's batches."""
+    from module_synthetic import generate_students
+    from module_write_queue import WriteBehindQueue
+    print(f"[writes] {writes} adds")
+    for name, backend in _e2e_backends():
+        backend.setup()
+        try:
+            rows = list(generate_students(writes, start_roll_no=BENCH_ROLL_NO_START))
+            start = time.perf_counter()
+            for row in rows:
+                backend.add(row)
+            print(f"  {name:6} per-write commit: {writes / (time.perf_counter() - start):10.0f} adds/sec")
+            for batch_size in batch_sizes:
+                first = BENCH_ROLL_NO_START + batch_size * writes
+                rows = list(generate_students(writes, seed=batch_size, start_roll_no=first))
+                queue = WriteBehindQueue(os.path.join(tempfile.mkdtemp(), "pending.jsonl"), backend=backend,
+                                         batch_size=batch_size).start()
+                start = time.perf_counter()
+                for row in rows:
+                    queue.submit("Add", row)
+                queue.flush()
+                elapsed = time.perf_counter() - start
+                queue.close()
+                print(f"  {name:6} queue, batch {batch_size:4}: {writes / elapsed:10.0f} adds/sec")
+        finally:
+            _remove_bench_rows(name)
+
+
+def _has_procedure(name):
+    """Whether the current MySQL database defines stored procedure ``name``;
+    setup_database does not create ManageStudents."""
+    with module_database.get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM information_schema.ROUTINES WHERE ROUTINE_SCHEMA = DATABASE()"
+                       " AND ROUTINE_TYPE = 'PROCEDURE' AND ROUTINE_NAME = %s", (name,))
+        (found,) = cursor.fetchone()
+        cursor.close()
+    return bool(found)
+
+
+def bench_prepared(ops=2_000):
+    """Compare Add/Update/Delete latency through the ManageStudents procedure
+    (callproc) with the prepared statements module_database now uses, and
+    searches and pages sent as text SQL with the same queries prepared."""
+    if not _mysql_available():
+        print("[prepared] skipped (MySQL not reachable)")
+        return
+    from module_synthetic import generate_students
+    module_database.setup_database()
+
+    def procedure(action):
+        def call(row):
+            module_database.execute_stored_procedure("ManageStudents", (action,) + tuple(row) + (None, None))
+        return call
+
+    def text_query(sql, params):
+        with module_database.get_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            cursor.close()
+
+    def prepared_query(sql, params):
+        with module_database.get_pool().connection() as conn:
+            module_database.run_prepared(conn, sql, params)
+
+    def report(label, action, summary):
+        print(f"  {label:8} {action:10}: {summary['p50_ms']:7.3f} / {summary['p95_ms']:7.3f}"
+              f"   {summary['ops_per_sec']:8.0f} ops/sec")
+
+    prepared = {"Add": module_database.insert_student, "Update": module_database.update_student,
+                "Delete": lambda row: module_database.delete_student(row[1])}
+    writes = [(0, "callproc", {a: procedure(a) for a in prepared}), (1, "prepared", prepared)]
+    print(f"[prepared] {ops} calls per action, p50/p95 ms")
+    try:
+        if not _has_procedure("ManageStudents"):
+            print("  callproc skipped (no ManageStudents procedure in this database)")
+            writes = writes[1:]
+        for offset, label, calls in writes:
+            rows = [(row,) for row in generate_students(ops, seed=offset,
+                                                        start_roll_no=BENCH_ROLL_NO_START + offset * ops)]
+            for action in ("Add", "Update", "Delete"):
+                report(label, action, _timed_calls(calls[action], rows))
+
+        rows = list(generate_students(ops, start_roll_no=BENCH_ROLL_NO_START))
+        module_database.insert_students(rows)
+        queries = {
+            "Search": [module_database.build_search_query("email", row[2][:6], "prefix") for row in rows],
+            "GetPage": [module_database.build_page_query(row[1]) for row in rows],
+        }
+        for action, args in queries.items():
+            report("text", action, _timed_calls(text_query, args))
+            report("prepared", action, _timed_calls(prepared_query, args))
+    finally:
+        _remove_bench_rows("mysql")
+        module_database.close_pool()
+
+
+BENCHMARKS = {
+    "async": bench_async,
+    "audit": bench_audit,
+    "backends": bench_backends,
+    "bulk": bench_bulk,
+    "changes": bench_changes,
+    "e2e": bench_e2e,
+    "listing": bench_listing,
+    "live_search": bench_live_search,
+    "memory": bench_memory,
+    "metrics": bench_metrics,
+    "pool": bench_pool,
+    "prepared": bench_prepared,
+    "server": bench_server,
+    "startup": bench_startup,
+    "tree": bench_tree,
+    "validate": bench_validate,
+    "writes": bench_writes,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run: " + ", ".join(sorted(BENCHMARKS)))
+    parser.add_argument("--json", help="also write the results of benchmarks that return them (e.g. e2e) here")
+    args = parser.parse_args()
+    names = args.names or sorted(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    results = {}
+    for name in names:
+        result = BENCHMARKS[name]()
+        if result is not None:
+            results[name] = result
+    if args.json:
+        import json
+        import platform
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "timestamp": time.time(), "results": results}, f, indent=2)
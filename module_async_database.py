@@ -0,0 +1,159 @@
+"""asyncio variant of module_database, backed by an aiomysql connection pool.
+
+Lets one event loop keep many student queries in flight at once instead of
+tying up a thread per query. Queries, schema migrations and the query cache
+are shared with module_database so both paths behave the same.
+"""
+import asyncio
+
+try:
+    import aiomysql
+except ImportError:  # optional: only needed when the async backend is used
+    aiomysql = None
+
+from module_database import (DB_CONFIG, DISABLE_FULLTEXT_STOPWORDS, DUPLICATE_KEY_ERRNO, MIGRATIONS_TABLE_DDL,
+                             MUTATING_ACTIONS, PAGE_SIZE, SCHEMA_MIGRATIONS, STUDENT_STATEMENTS, STUDENTS_TABLE_DDL,
+                             build_page_query, build_search_query, query_cache, statement_params)
+from module_metrics import metrics
+
+ASYNC_POOL_MIN_SIZE = 1
+ASYNC_POOL_MAX_SIZE = 20
+
+_pool = None  # future resolving to the aiomysql pool, shared by every caller
+
+
+async def _create_pool():
+    config = dict(DB_CONFIG)
+    config["db"] = config.pop("database")
+    from pymysql.constants import CLIENT
+    # aiomysql's pool closes a released connection that is still inside a
+    # transaction, and reads never commit; with autocommit every connection
+    # goes back clean and is reused. FOUND_ROWS as in ConnectionPool.
+    return await aiomysql.create_pool(minsize=ASYNC_POOL_MIN_SIZE, maxsize=ASYNC_POOL_MAX_SIZE,
+                                      pool_recycle=3600, autocommit=True, client_flag=CLIENT.FOUND_ROWS,
+                                      **config)
+
+
+async def get_async_pool():
+    """Return the shared aiomysql pool, creating it on first use."""
+    global _pool
+    if aiomysql is None:
+        raise RuntimeError("The async database backend requires the aiomysql package")
+    if _pool is None:
+        _pool = asyncio.ensure_future(_create_pool())
+    pending = _pool
+    try:
+        # shield: a cancelled caller must not cancel creation for everyone else
+        return await asyncio.shield(pending)
+    except Exception:
+        if _pool is pending and pending.done():
+            _pool = None
+        raise
+
+
+async def close_async_pool():
+    global _pool
+    pending, _pool = _pool, None
+    if pending is not None and pending.done() and not pending.exception():
+        pool = pending.result()
+        pool.close()
+        await pool.wait_closed()
+
+
+async def async_setup_database():
+    """Async counterpart of module_database.setup_database."""
+    pool = await get_async_pool()
+    with metrics.timed("Setup"):
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(STUDENTS_TABLE_DDL)
+                await cursor.execute(MIGRATIONS_TABLE_DDL)
+                await cursor.execute("SELECT version FROM schema_migrations")
+                applied = {version for (version,) in await cursor.fetchall()}
+                pending = [(version, statement) for version, statement in SCHEMA_MIGRATIONS if version not in applied]
+                if pending:
+                    await cursor.execute(DISABLE_FULLTEXT_STOPWORDS)
+                for version, statement in pending:
+                    await cursor.execute(statement)
+                    await cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            await conn.commit()
+
+
+async def async_execute_stored_procedure(proc_name, args):
+    """Async counterpart of module_database.execute_stored_procedure.
+
+    aiomysql has no stored_results(), so the result sets come back already
+    read, as a list of row lists.
+    """
+    pool = await get_async_pool()
+    action = args[0] if args and isinstance(args[0], str) else proc_name
+    with metrics.timed(action, proc_name) as timer:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.callproc(proc_name, args)
+                results = []
+                while True:
+                    if cursor.description:
+                        results.append(list(await cursor.fetchall()))
+                    if not await cursor.nextset():
+                        break
+            await conn.commit()
+        timer.rows = sum(len(rows) for rows in results)
+    if args and args[0] in MUTATING_ACTIONS:
+        query_cache.invalidate(args[2], None if args[0] == "Delete" else tuple(args[1:8]))
+    return results
+
+
+async def _write_student(action, params, roll_no, row):
+    # aiomysql has no server-side prepared statements, so the values are
+    # escaped into STUDENT_STATEMENTS by the client instead.
+    pool = await get_async_pool()
+    with metrics.timed(action) as timer:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                count = timer.rows = await cursor.execute(STUDENT_STATEMENTS[action], params)
+    if count:
+        query_cache.invalidate(roll_no, row)
+    return count > 0
+
+
+async def async_insert_student(row):
+    """Async counterpart of module_database.insert_student."""
+    row = tuple(row)
+    try:
+        return await _write_student("Add", statement_params("Add", row), row[1], row)
+    except aiomysql.IntegrityError as err:
+        if err.args[0] == DUPLICATE_KEY_ERRNO:
+            return False
+        raise
+
+
+async def async_update_student(row):
+    """Async counterpart of module_database.update_student."""
+    row = tuple(row)
+    return await _write_student("Update", statement_params("Update", row), row[1], row)
+
+
+async def async_delete_student(roll_no):
+    return await _write_student("Delete", (roll_no,), roll_no, None)
+
+
+async def _fetch(action, sql, params):
+    pool = await get_async_pool()
+    with metrics.timed(action, sql) as timer:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = list(await cursor.fetchall())
+        timer.rows = len(rows)
+    return rows
+
+
+async def async_fetch_page(after_roll_no=None, limit=PAGE_SIZE):
+    """Async counterpart of module_database.fetch_page (uncached)."""
+    return await _fetch("GetAll", *build_page_query(after_roll_no, limit))
+
+
+async def async_find_students(column, query, mode="prefix", limit=PAGE_SIZE):
+    """Async counterpart of module_database.find_students (uncached)."""
+    return await _fetch("Search", *build_search_query(column, query, mode, limit))
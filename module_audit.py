@@ -0,0 +1,127 @@
+"""Data-quality audit of the whole students table.
+
+The form validates what users type, but rows can also arrive through bulk
+imports of old files, other tools or direct SQL. ``audit_students`` checks
+every stored row with the module_validate rules, flags impossible dates of
+birth and finds emails and contact numbers shared by several students, and
+writes every problem to a CSV report.
+
+The table is split into roll_no ranges of ``chunk_size`` students; worker
+processes each read and check one range at a time straight from the
+database, so the work spreads over all cores and only the problems travel
+back. At most two ranges per worker are in flight, and duplicates are found
+by GROUP BY in the database, so memory use stays flat however large the
+table grows.
+"""
+import csv
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from multiprocessing import get_context
+
+import module_storage
+from module_validate import validate_contacts, validate_emails
+
+AUDIT_CHUNK_SIZE = 5000
+DUPLICATE_COLUMNS = ("email", "contact")
+MIN_STUDENT_AGE = 3    # years; younger dates of birth are flagged "too_young"
+MAX_STUDENT_AGE = 100  # years; older ones are flagged "too_old"
+REPORT_COLUMNS = ("roll_no", "column", "value", "problem")
+
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29 February
+        return day.replace(year=day.year - years, day=28)
+
+
+def dob_checker(today):
+    """Return a function giving why a date of birth is impossible on ``today``, or None."""
+    youngest = _years_before(today, MIN_STUDENT_AGE)
+    oldest = _years_before(today, MAX_STUDENT_AGE)
+
+    def problem(dob):
+        if dob is None or dob == "":
+            return "missing"
+        if not isinstance(dob, date):
+            return "not_a_date"
+        if oldest <= dob <= youngest:
+            return None
+        if dob > today:
+            return "in_future"
+        return "too_young" if dob > youngest else "too_old"
+    return problem
+
+
+def _column_problems(rows, index, validate):
+    values = [row[index] for row in rows]
+    present = [i for i, value in enumerate(values) if value]
+    _, reasons = validate([values[i] for i in present])
+    problems = [(rows[i][1], values[i], "missing") for i, value in enumerate(values) if not value]
+    problems.extend((rows[i][1], values[i], reason) for i, reason in zip(present, reasons) if reason)
+    return problems
+
+
+def check_rows(rows, today):
+    """Return ``(roll_no, column, value, problem)`` for everything wrong with ``rows``."""
+    problems = []
+    for index, column, validate in ((2, "email", validate_emails), (4, "contact", validate_contacts)):
+        problems.extend((roll_no, column, value, problem)
+                        for roll_no, value, problem in _column_problems(rows, index, validate))
+    dob_problem = dob_checker(today)
+    for row in rows:
+        problem = dob_problem(row[5])
+        if problem:
+            problems.append((row[1], "dob", row[5], problem))
+    problems.sort(key=lambda problem: problem[0])
+    return problems
+
+
+def _init_worker(backend_name, config):
+    module_storage.configure_backend(backend_name, **config)
+
+
+def _audit_range(after_roll_no, last_roll_no, today):
+    rows = module_storage.get_backend().fetch_range(after_roll_no, last_roll_no)
+    return len(rows), check_rows(rows, today)
+
+
+def audit_students(report_path, workers=None, chunk_size=AUDIT_CHUNK_SIZE, today=None):
+    """Audit the configured backend's students table and write the problems to ``report_path``.
+
+    Returns a Counter with the number of ``rows`` checked and of problems
+    per ``"column:problem"``.
+    """
+    backend = module_storage.get_backend()
+    workers = workers or os.cpu_count() or 1
+    today = today or date.today()
+    summary = Counter(rows=0)
+
+    def write(result):
+        row_count, problems = result
+        summary["rows"] += row_count
+        for problem in problems:
+            writer.writerow(problem)
+            summary[f"{problem[1]}:{problem[3]}"] += 1
+
+    # spawn: forked children would inherit the parent's open database connections
+    pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                               initargs=(backend.name, backend.config()))
+    with pool, open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        pending = deque()
+        for after_roll_no, last_roll_no in backend.chunk_bounds(chunk_size):
+            pending.append(pool.submit(_audit_range, after_roll_no, last_roll_no, today))
+            if len(pending) >= 2 * workers:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+        for column in DUPLICATE_COLUMNS:
+            for value, count, roll_nos in backend.find_duplicates(column):
+                for roll_no in roll_nos:
+                    writer.writerow((roll_no, column, value, "duplicate"))
+                summary[f"{column}:duplicate"] += count
+    return summary
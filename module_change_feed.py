@@ -0,0 +1,77 @@
+"""Keep a client's view of the students table in step with other clients.
+
+Every write to the students table appends its roll_no to the
+students_changes log under a new, increasing version (see module_storage).
+A client remembers the last version it has seen and asks only for the log
+entries after it, getting back each changed student as it is stored now,
+or None if it was deleted. Because entries carry the current row rather
+than the write itself, applying one twice is harmless.
+
+MySQL hands out AUTO_INCREMENT versions when a transaction inserts, not
+when it commits, so a version can become visible after a higher one. A
+skipped version is therefore kept as a gap and re-read on the next polls,
+until it shows up or MAX_GAP_POLLS polls have passed (a rolled-back write
+leaves a gap that never fills).
+
+Patching rows in one at a time only pays while there are few of them: after
+a bulk import, or once the log entries a client still needed have been
+pruned (see module_service.setup_storage), poll returns RELOAD and the
+client reloads its rows instead.
+"""
+import module_service
+from module_database import CHANGE_BATCH_SIZE
+
+CHANGE_POLL_MS = 2000
+MAX_GAP_POLLS = 5
+MAX_CHANGES_PER_POLL = 200  # more changed students than this are reloaded rather than patched in
+RELOAD = "reload"
+
+
+class ChangeFeed:
+    def __init__(self, limit=CHANGE_BATCH_SIZE, max_gap_polls=MAX_GAP_POLLS, max_changes=MAX_CHANGES_PER_POLL):
+        self.limit = limit
+        self.max_gap_polls = max_gap_polls
+        self.max_changes = max_changes
+        self.version = None
+        self._gaps = {}  # missing version -> polls it has been missing for
+
+    def start(self):
+        """Start from the newest version; call before loading the rows the changes will be applied to."""
+        self.version = module_service.change_version()
+        self._gaps = {}
+
+    def poll(self):
+        """Return ``{roll_no: row or None}`` for students changed since the last poll,
+        or RELOAD if more than ``max_changes`` changed or the log no longer goes
+        back far enough; the feed then starts over from the newest version."""
+        if self.version is None:
+            self.start()
+            return {}
+        since = min(self._gaps) - 1 if self._gaps else self.version
+        changes = module_service.student_changes(since, self.limit)
+        # A first entry past since + 1 is usually a gap, but may mean the entries before it were pruned
+        if changes and changes[0][0] > since + 1 and module_service.oldest_change_version() > since + 1:
+            self.start()
+            return RELOAD
+        changed = {}
+        while True:
+            for version, roll_no, row in changes:
+                changed[roll_no] = row
+                self._gaps.pop(version, None)
+                if version > self.version:
+                    # Very large jumps come from bulk rollbacks or auto_increment_increment, not in-flight writes
+                    if version - self.version <= self.limit:
+                        self._gaps.update(dict.fromkeys(range(self.version + 1, version), 0))
+                    self.version = version
+            if len(changed) > self.max_changes:
+                self.start()
+                return RELOAD
+            if len(changes) < self.limit:
+                break
+            since = changes[-1][0]
+            changes = module_service.student_changes(since, self.limit)
+        for version in list(self._gaps):
+            self._gaps[version] += 1
+            if self._gaps[version] > self.max_gap_polls:
+                del self._gaps[version]
+        return changed
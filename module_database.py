@@ -1,17 +1,278 @@
-import mysql.connector
-from tkinter import messagebox
+import csv
+import json
+import os
+import queue
+import threading
+import sys
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from datetime import date
+from module_metrics import metrics
+from module_validate import validate_email, validate_contact
 
-def setup_database():
-    """Connect to the database and create the students table if it doesn't exist."""
-    try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="students_db"
-        )
-        cursor = conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS students (
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "students_db",
+}
+POOL_SIZE = 5
+POOL_TIMEOUT = 10          # seconds to wait for a free connection
+HEALTH_CHECK_INTERVAL = 30  # ping connections that sat idle longer than this
+PAGE_SIZE = 200
+STUDENT_COLUMNS = ("name", "roll_no", "email", "gender", "contact", "dob", "address")
+BULK_BATCH_SIZE = 1000
+MUTATING_ACTIONS = ("Add", "Update", "Delete")
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHE_TTL = 30  # seconds a cached result is served before it is re-read
+CHANGE_BATCH_SIZE = 1000  # change-log entries returned per fetch_changes call
+CHANGE_RETENTION_SECONDS = 7 * 24 * 3600  # change-log entries older than this are pruned
+NGRAM_TOKEN_SIZE = 2  # MySQL default ngram_token_size; shorter terms cannot use a FULLTEXT index
+
+
+def _pool_error(message):
+    from mysql.connector.errors import PoolError
+    return PoolError(message)
+
+
+class ConnectionPool:
+    """A small thread-safe pool of reusable database connections.
+
+    Connections are opened lazily (up to ``size``) and handed back to the
+    pool instead of being closed. A connection that has been idle for longer
+    than ``health_check_interval`` seconds is pinged before reuse and
+    replaced if the server has dropped it.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT,
+                 health_check_interval=HEALTH_CHECK_INTERVAL, connect=None, **config):
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.config = config or dict(DB_CONFIG)
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _new_connection(self):
+        if self._connect is not None:
+            return self._connect(**self.config)
+        import mysql.connector  # deferred: slow to import and unused with the SQLite backend
+        from mysql.connector.constants import ClientFlag
+        # FOUND_ROWS: an UPDATE reports the rows it matched, not only those it
+        # changed, so saving a student unchanged still counts as a success.
+        return mysql.connector.connect(client_flags=[ClientFlag.FOUND_ROWS], **self.config)
+
+    def _is_healthy(self, conn):
+        try:
+            return conn.is_connected()
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        if self._closed:
+            raise _pool_error("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise _pool_error("Timed out waiting for a free database connection")
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_connection()
+                if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _end_transaction(self, conn):
+        # With autocommit off the driver opens a transaction for reads too, and
+        # they never commit. Left open, the next borrower of this connection
+        # would keep reading that transaction's REPEATABLE READ snapshot.
+        if not getattr(conn, "in_transaction", True):
+            return True
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def release(self, conn, broken=False):
+        if not (broken or self._closed):
+            broken = not self._end_transaction(conn)
+        if broken or self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block."""
+        if metrics.enabled:
+            start = time.perf_counter()
+            conn = self.acquire()
+            metrics.record_acquire(time.perf_counter() - start)
+        else:
+            conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the module-level pool shared by every database call."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**DB_CONFIG)
+    return _pool
+
+
+def configure_pool(size=POOL_SIZE, timeout=POOL_TIMEOUT,
+                   health_check_interval=HEALTH_CHECK_INTERVAL, **config):
+    """Replace the shared pool, e.g. to change its size or connection settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(size, timeout, health_check_interval, **(config or DB_CONFIG))
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+
+class QueryCache:
+    """Bounded LRU cache of query results, keyed by action and arguments.
+
+    Every entry remembers which roll numbers it holds and a predicate
+    telling whether a new or changed row could belong in it, so a write to
+    one student drops only the entries that write can affect. Entries also
+    expire after ``ttl`` seconds to pick up changes made by other clients.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[3] > self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, rows, affected_by=None, generation=None):
+        """Store ``rows``; ``affected_by(row)`` says whether adding or
+        updating ``row`` could change this result.
+
+        Pass the ``generation`` read before running the query: if any write
+        invalidated the cache since, the rows may be stale and are not kept.
+        """
+        size = sys.getsizeof(rows) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (rows, {row[1] for row in rows}, affected_by, time.monotonic(), size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        self.size -= self._entries.pop(key)[4]
+
+    def invalidate(self, roll_no, row=None):
+        """Drop entries affected by a write to ``roll_no``; ``row`` is the
+        student's new values for an add or update, None for a delete."""
+        with self._lock:
+            stale = [key for key, (_, roll_nos, affected_by, _, _) in self._entries.items()
+                     if roll_no in roll_nos or (row is not None and (affected_by is None or affected_by(row)))]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            self.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations}
+
+
+query_cache = QueryCache()
+
+
+def _fold(value):
+    """Approximate MySQL's case- and accent-insensitive collation for cache matching."""
+    text = unicodedata.normalize("NFKD", str(value))
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold().rstrip()
+
+
+STUDENTS_TABLE_DDL = '''CREATE TABLE IF NOT EXISTS students (
                             name VARCHAR(100),
                             roll_no INT PRIMARY KEY,
                             email VARCHAR(100),
@@ -19,27 +280,651 @@ def setup_database():
                             contact VARCHAR(20),
                             dob DATE,
                             address TEXT
-                        )''')
+                        )'''
+MIGRATIONS_TABLE_DDL = '''CREATE TABLE IF NOT EXISTS schema_migrations (
+                            version INT PRIMARY KEY,
+                            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )'''
+
+# Schema changes applied by setup_database, in order. Each version runs once
+# and is recorded in schema_migrations.
+SCHEMA_MIGRATIONS = [
+    (1, "CREATE INDEX idx_students_name ON students (name)"),
+    (2, "CREATE INDEX idx_students_email ON students (email)"),
+    (3, "CREATE INDEX idx_students_dob ON students (dob)"),
+    (4, "CREATE INDEX idx_students_gender ON students (gender)"),
+    (5, "CREATE INDEX idx_students_contact ON students (contact)"),
+    (6, "CREATE FULLTEXT INDEX ft_students_name ON students (name) WITH PARSER ngram"),
+    (7, "CREATE FULLTEXT INDEX ft_students_address ON students (address) WITH PARSER ngram"),
+    # Change log: every write to students, including ManageStudents calls and
+    # bulk imports, appends the roll_no it touched under a new version
+    (8, """CREATE TABLE IF NOT EXISTS students_changes (
+                version BIGINT AUTO_INCREMENT PRIMARY KEY,
+                roll_no INT NOT NULL,
+                changed_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6)
+            )"""),
+    (9, """CREATE TRIGGER students_changes_insert AFTER INSERT ON students FOR EACH ROW
+                INSERT INTO students_changes (roll_no) VALUES (NEW.roll_no)"""),
+    (10, """CREATE TRIGGER students_changes_update AFTER UPDATE ON students FOR EACH ROW
+                INSERT INTO students_changes (roll_no) VALUES (NEW.roll_no)"""),
+    (11, """CREATE TRIGGER students_changes_delete AFTER DELETE ON students FOR EACH ROW
+                INSERT INTO students_changes (roll_no) VALUES (OLD.roll_no)"""),
+    # Functional index for the email domain filter of fetch_listing
+    (12, "CREATE INDEX idx_students_email_domain ON students ((SUBSTRING_INDEX(email, '@', -1)))"),
+    # Rebuild the ngram indexes of 6 and 7 without stopwords (see apply_migrations)
+    (13, """ALTER TABLE students DROP INDEX ft_students_name,
+                ADD FULLTEXT INDEX ft_students_name (name) WITH PARSER ngram"""),
+    (14, """ALTER TABLE students DROP INDEX ft_students_address,
+                ADD FULLTEXT INDEX ft_students_address (address) WITH PARSER ngram"""),
+]
+# The ngram parser skips every token that contains a stopword, and InnoDB's
+# default list includes "a" and "i", so most bigrams of names and addresses
+# would never be indexed. A FULLTEXT index keeps the setting it was built with.
+DISABLE_FULLTEXT_STOPWORDS = "SET SESSION innodb_ft_enable_stopword = OFF"
+
+
+def apply_migrations(cursor):
+    cursor.execute(MIGRATIONS_TABLE_DDL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    applied = {version for (version,) in cursor.fetchall()}
+    pending = [(version, statement) for version, statement in SCHEMA_MIGRATIONS if version not in applied]
+    if pending:
+        cursor.execute(DISABLE_FULLTEXT_STOPWORDS)
+    for version, statement in pending:
+        cursor.execute(statement)
+        cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+
+
+def setup_database():
+    """Connect to the database, create the students table if it doesn't exist
+    and bring its indexes up to date."""
+    with metrics.timed("Setup"), get_pool().connection() as conn:
+        with closing(conn.cursor()) as cursor:
+            cursor.execute(STUDENTS_TABLE_DDL)
+            apply_migrations(cursor)
         conn.commit()
-    except mysql.connector.Error as err:
-        messagebox.showerror("Error", f"Error connecting to MySQL: {err}")
 
 
 def execute_stored_procedure(proc_name, args):
+    # callproc buffers every result set, so they stay readable after the
+    # cursor is closed and the connection has gone back to the pool.
+    action = args[0] if args and isinstance(args[0], str) else proc_name
+    with metrics.timed(action, proc_name) as timer, get_pool().connection() as conn:
+        with closing(conn.cursor()) as cursor:
+            cursor.callproc(proc_name, args)
+            conn.commit()
+            results = list(cursor.stored_results())
+            timer.rows = sum(result.rowcount for result in results)
+    if args and args[0] in MUTATING_ACTIONS:
+        query_cache.invalidate(args[2], None if args[0] == "Delete" else tuple(args[1:8]))
+    return results
+
+
+# One fixed statement per operation, prepared on the server once per pooled
+# connection and then only executed: the server keeps the parsed statement
+# and its plan, values travel in the binary protocol, and no column name is
+# ever spliced into SQL at call time.
+STUDENT_STATEMENTS = {
+    "Add": f"INSERT INTO students ({', '.join(STUDENT_COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+    "Update": ("UPDATE students SET name = %s, email = %s, gender = %s, contact = %s, dob = %s, address = %s "
+               "WHERE roll_no = %s"),
+    "Delete": "DELETE FROM students WHERE roll_no = %s",
+    "Lock": f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students WHERE roll_no = %s FOR UPDATE",
+}
+DUPLICATE_KEY_ERRNO = 1062
+# Reads are prepared too: build_page_query, build_search_query and
+# build_listing_query only ever produce a bounded set of statements (one
+# per column, mode, sort and filter combination), each with its values as
+# parameters. The least recently used beyond this many are closed.
+PREPARED_STATEMENTS_PER_CONNECTION = 64
+
+# connection -> OrderedDict of sql -> (sql, prepared cursor); entries go with the connection
+_prepared_cursors = weakref.WeakKeyDictionary()
+
+
+def run_prepared(conn, sql, params=()):
+    """Execute ``sql`` as a server-side prepared statement on ``conn``.
+
+    Returns the rows of a SELECT, else the rowcount. Each connection keeps
+    one prepared cursor per statement, so a statement is prepared once and
+    then only executed. The driver skips re-preparing only when handed the
+    very string it prepared, so the cached copy of ``sql`` is the one run.
+    """
+    statements = _prepared_cursors.get(conn)
+    if statements is None:
+        statements = _prepared_cursors[conn] = OrderedDict()
+    entry = statements.get(sql)
+    if entry is None:
+        entry = statements[sql] = (sql, conn.cursor(prepared=True))
+        if len(statements) > PREPARED_STATEMENTS_PER_CONNECTION:
+            _, (_, evicted) = statements.popitem(last=False)
+            try:
+                evicted.close()
+            except Exception:
+                pass  # the statement goes with the connection anyway
+    else:
+        statements.move_to_end(sql)
+    sql, cursor = entry
+    cursor.execute(sql, params)
+    if cursor.description is not None:
+        return [tuple(row) for row in cursor.fetchall()]
+    return cursor.rowcount
+
+
+def statement_params(action, row):
+    """Return the parameters of STUDENT_STATEMENTS[action] for a student row."""
+    name, roll_no, email, gender, contact, dob, address = row
+    if action == "Update":
+        return (name, email, gender, contact, dob, address, roll_no)
+    if action == "Add":
+        return tuple(row)
+    return (roll_no,)
+
+
+def run_statement(conn, name, params):
+    """Execute STUDENT_STATEMENTS[name] on ``conn``; returns the rows of a SELECT, else the rowcount."""
+    return run_prepared(conn, STUDENT_STATEMENTS[name], params)
+
+
+def _write_student(action, params, roll_no, row):
+    with metrics.timed(action) as timer, get_pool().connection() as conn:
+        count = timer.rows = run_statement(conn, action, params)
+        conn.commit()
+    if count:
+        query_cache.invalidate(roll_no, row)
+    return count > 0
+
+
+def insert_student(row):
+    """Insert one student row; returns False if its roll_no is taken."""
+    from mysql.connector import errors
+    row = tuple(row)
+    try:
+        return _write_student("Add", statement_params("Add", row), row[1], row)
+    except errors.IntegrityError as err:
+        if err.errno == DUPLICATE_KEY_ERRNO:
+            return False
+        raise
+
+
+def update_student(row):
+    """Replace the student with ``row[1]``; returns False if there is none."""
+    row = tuple(row)
+    return _write_student("Update", statement_params("Update", row), row[1], row)
+
+
+def delete_student(roll_no):
+    return _write_student("Delete", (roll_no,), roll_no, None)
+
+
+# Columns the listing can be sorted by: each has an index, and since InnoDB
+# secondary indexes end with the primary key, ORDER BY column, roll_no walks
+# it in order (in either direction) and keyset pages start with a seek.
+SORT_COLUMNS = ("name", "roll_no", "email", "gender", "contact", "dob")
+LISTING_FILTERS = ("gender", "dob", "email_domain")
+EMAIL_DOMAIN_SQL = "SUBSTRING_INDEX(email, '@', -1)"  # matches idx_students_email_domain
+
+
+def build_listing_query(sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE,
+                        email_domain_sql=EMAIL_DOMAIN_SQL):
+    """Build the SQL for fetch_listing as ``(sql, params)``.
+
+    ``after`` is the ``(sort value, roll_no)`` of the last row of the previous
+    page; its sort value may be None. ``filters`` may hold any of:
+      gender        exact match
+      dob           inclusive ``(start, end)``; either end may be None
+      email_domain  the part of the email after "@"
+    """
+    if sort_column not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort_column!r}")
+    filters = filters or {}
+    conditions, params = [], []
+    if filters.get("gender"):
+        conditions.append("gender = %s")
+        params.append(filters["gender"])
+    start, end = filters.get("dob") or (None, None)
+    if start:
+        conditions.append("dob >= %s")
+        params.append(start)
+    if end:
+        conditions.append("dob <= %s")
+        params.append(end)
+    if filters.get("email_domain"):
+        conditions.append(f"{email_domain_sql} = %s")
+        params.append(filters["email_domain"])
+    direction, compare = (" DESC", "<") if descending else ("", ">")
+    if sort_column == "roll_no":
+        order = f"roll_no{direction}"
+        if after is not None:
+            conditions.append(f"roll_no {compare} %s")
+            params.append(after[1])
+    else:
+        order = f"{sort_column}{direction}, roll_no{direction}"
+        if after is not None:
+            conditions.append(_seek_condition(sort_column, descending, after[0] is None))
+            params.extend(after if after[0] is not None else after[1:])
+    sql = f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return f"{sql} ORDER BY {order} LIMIT %s", tuple(params) + (limit,)
+
+
+def _seek_condition(sort_column, descending, after_null):
+    # Every column but roll_no may hold NULL (rows written without the form),
+    # and a row value comparison with NULL is never true. NULLs sort first in
+    # ascending order, in both MySQL and SQLite, and last in descending.
+    if not descending:
+        if after_null:
+            return f"({sort_column} IS NULL AND roll_no > %s OR {sort_column} IS NOT NULL)"
+        return f"({sort_column}, roll_no) > (%s, %s)"
+    if after_null:
+        return f"{sort_column} IS NULL AND roll_no < %s"
+    return f"(({sort_column}, roll_no) < (%s, %s) OR {sort_column} IS NULL)"
+
+
+def listing_predicate(filters):
+    """Return a test for whether a row passes fetch_listing ``filters``."""
+    filters = filters or {}
+    gender = _fold(filters["gender"]) if filters.get("gender") else None
+    start, end = (str(value) if value else None for value in filters.get("dob") or (None, None))
+    domain = _fold(filters["email_domain"]) if filters.get("email_domain") else None
+
+    def matches(row):
+        return ((gender is None or _fold(row[3]) == gender)
+                and (start is None or str(row[5]) >= start) and (end is None or str(row[5]) <= end)
+                and (domain is None or _fold(str(row[2]).rsplit("@", 1)[-1]) == domain))
+    return matches
+
+
+def listing_key(row, sort_column):
+    """Return the keyset position of ``row`` in a listing sorted by ``sort_column``."""
+    return (row[STUDENT_COLUMNS.index(sort_column)], row[1])
+
+
+def build_page_query(after_roll_no=None, limit=PAGE_SIZE):
+    """Build the keyset pagination SQL for fetch_page as ``(sql, params)``."""
+    sql = f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students"
+    params = ()
+    if after_roll_no is not None:
+        sql += " WHERE roll_no > %s"
+        params = (after_roll_no,)
+    return sql + " ORDER BY roll_no LIMIT %s", params + (limit,)
+
+
+def fetch_page(after_roll_no=None, limit=PAGE_SIZE, use_cache=True):
+    """Return up to ``limit`` students ordered by roll_no, starting after ``after_roll_no``.
+
+    Uses keyset pagination on the primary key, so every page is an index
+    range scan no matter how deep into the table it is.
+    """
+    key = ("GetPage", after_roll_no, limit)
+    if use_cache:
+        rows = query_cache.get(key)
+        if rows is not None:
+            return rows
+        generation = query_cache.generation
+    with metrics.timed("GetAll", f"after={after_roll_no} limit={limit}") as timer, get_pool().connection() as conn:
+        rows = run_prepared(conn, *build_page_query(after_roll_no, limit))
+        timer.rows = len(rows)
+    if use_cache:
+        # A new row lands on this page if it sorts after the page start and
+        # before its last row (or anywhere past the start, on the final page)
+        last_roll_no = rows[-1][1] if len(rows) == limit else None
+        query_cache.put(key, rows, lambda row: (after_roll_no is None or row[1] > after_roll_no)
+                        and (last_roll_no is None or row[1] < last_roll_no), generation)
+    return rows
+
+
+def _file_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json") else "csv"
+
+
+def read_student_records(path, fmt=None):
+    """Yield ``(line_no, record)`` pairs from a CSV or JSONL file, one at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if _file_format(path, fmt) == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except ValueError as err:
+                        yield line_no, err
+        else:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+
+
+def validate_student_record(record):
+    """Check one imported record with the same rules as the GUI form.
+
+    Returns the row as a tuple in ``STUDENT_COLUMNS`` order, or raises
+    ValueError describing the first problem found.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"Unreadable record: {record}")
+    values = {col: str(record.get(col) or "").strip() for col in STUDENT_COLUMNS}
+    if not all(values.values()):
+        raise ValueError("All fields are required")
+    try:
+        roll_no = int(values["roll_no"])
+    except ValueError:
+        raise ValueError("Roll No must be an integer") from None
+    if not validate_contact(values["contact"]):
+        raise ValueError("Contact No must be at least 10 digits")
+    if not validate_email(values["email"]):
+        raise ValueError("Invalid email format")
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="students_db"
-        )
-        # Explicitly get the cursor from the connection
+        dob = date.fromisoformat(values["dob"])
+    except ValueError:
+        raise ValueError("D.O.B must be a YYYY-MM-DD date") from None
+    return (values["name"], roll_no, values["email"], values["gender"], values["contact"], dob, values["address"])
+
+
+def _insert_batch(batch, errors):
+    """Insert ``[(line_no, row), ...]`` in one transaction, falling back to
+    row-by-row inserts to pinpoint the rows the server rejects."""
+    import mysql.connector
+    query = (f"INSERT INTO students ({', '.join(STUDENT_COLUMNS)}) "
+             f"VALUES ({', '.join(['%s'] * len(STUDENT_COLUMNS))})")
+    with get_pool().connection() as conn:
+        with closing(conn.cursor()) as cursor:
+            try:
+                cursor.executemany(query, [row for _, row in batch])
+                conn.commit()
+                return len(batch)
+            except mysql.connector.Error:
+                conn.rollback()
+            inserted = 0
+            for line_no, row in batch:
+                try:
+                    cursor.execute(query, row)
+                    inserted += 1
+                except mysql.connector.Error as err:
+                    errors.append((line_no, str(err)))
+            conn.commit()
+            return inserted
+
+
+def import_students(path, fmt=None, batch_size=BULK_BATCH_SIZE):
+    """Stream students from a CSV or JSONL file into the students table.
+
+    Rows are validated with module_validate and inserted ``batch_size`` at a
+    time, one transaction per batch. Returns ``(inserted, errors)`` where
+    ``errors`` lists ``(line_no, message)`` for every rejected row.
+    """
+    inserted = 0
+    errors = []
+    batch = []
+    for line_no, record in read_student_records(path, fmt):
+        try:
+            batch.append((line_no, validate_student_record(record)))
+        except ValueError as err:
+            errors.append((line_no, str(err)))
+            continue
+        if len(batch) >= batch_size:
+            inserted += _insert_batch(batch, errors)
+            batch = []
+    if batch:
+        inserted += _insert_batch(batch, errors)
+    query_cache.clear()
+    return inserted, errors
+
+
+def insert_students(rows, batch_size=BULK_BATCH_SIZE):
+    """Insert already validated row tuples, ``batch_size`` per transaction.
+
+    Returns ``(inserted, errors)`` as import_students does, numbering rows
+    from 1 in place of file line numbers.
+    """
+    inserted = 0
+    errors = []
+    batch = []
+    for position, row in enumerate(rows, start=1):
+        batch.append((position, tuple(row)))
+        if len(batch) >= batch_size:
+            inserted += _insert_batch(batch, errors)
+            batch = []
+    if batch:
+        inserted += _insert_batch(batch, errors)
+    query_cache.clear()
+    return inserted, errors
+
+
+CHANGES_QUERY = (f"SELECT c.version, c.roll_no, s.roll_no IS NOT NULL, "
+                 f"{', '.join('s.' + column for column in STUDENT_COLUMNS)} "
+                 "FROM students_changes c LEFT JOIN students s ON s.roll_no = c.roll_no "
+                 "WHERE c.version > %s ORDER BY c.version LIMIT %s")
+CHANGE_VERSION_QUERY = "SELECT COALESCE(MAX(version), 0) FROM students_changes"
+OLDEST_CHANGE_QUERY = "SELECT COALESCE(MIN(version), 0) FROM students_changes"
+# The newest entry is always kept so versions keep counting up from it; the
+# derived table gets round MySQL refusing a subquery on the table being deleted from.
+PRUNE_CHANGES_QUERY = ("DELETE FROM students_changes WHERE changed_at < NOW(6) - INTERVAL %s SECOND "
+                       "AND version < (SELECT newest FROM (SELECT MAX(version) AS newest FROM students_changes) AS latest)")
+
+
+def change_version():
+    """Return the newest version in the change log (0 when it is empty)."""
+    with metrics.timed("ChangeVersion"), get_pool().connection() as conn:
+        return run_prepared(conn, CHANGE_VERSION_QUERY)[0][0]
+
+
+def oldest_change_version():
+    """Return the oldest version still in the change log (0 when it is empty)."""
+    with metrics.timed("OldestChange"), get_pool().connection() as conn:
+        return run_prepared(conn, OLDEST_CHANGE_QUERY)[0][0]
+
+
+def prune_changes(retention=CHANGE_RETENTION_SECONDS):
+    """Delete change-log entries older than ``retention`` seconds; returns how many.
+
+    A client that last polled before them can no longer catch up and reloads
+    instead (see module_change_feed).
+    """
+    with metrics.timed("PruneChanges") as timer, get_pool().connection() as conn:
         cursor = conn.cursor()
-        cursor.callproc(proc_name, args)
+        cursor.execute(PRUNE_CHANGES_QUERY, (retention,))
+        count = timer.rows = cursor.rowcount
+        cursor.close()
         conn.commit()
-        return list(cursor.stored_results())
-    except mysql.connector.Error:
-        # Re-raise the error for the test to catch
-        raise
+    return count
+
+
+def fetch_changes(since, limit=CHANGE_BATCH_SIZE):
+    """Return ``(version, roll_no, row)`` for change-log entries newer than ``since``.
+
+    ``row`` is the student as stored now, or None if it has been deleted, so
+    applying the entries in order (or applying one twice) always ends at the
+    current state.
+    """
+    with metrics.timed("Changes", f"since={since}") as timer, get_pool().connection() as conn:
+        changes = [(version, roll_no, tuple(row) if exists else None)
+                   for version, roll_no, exists, *row in run_prepared(conn, CHANGES_QUERY, (since, limit))]
+        timer.rows = len(changes)
+    for _, roll_no, row in changes:
+        # Writes by other clients never went through this process's cache
+        query_cache.invalidate(roll_no, row)
+    return changes
+
+
+def iter_students(batch_size=BULK_BATCH_SIZE):
+    """Yield every student in roll_no order, fetching ``batch_size`` rows at a time."""
+    after_roll_no = None
+    while True:
+        rows = fetch_page(after_roll_no, batch_size, use_cache=False)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after_roll_no = rows[-1][1]
+
+
+# Chunking and duplicate detection for module_audit
+MAX_ROLL_NO = 2**63 - 1  # end of the last chunk
+CHUNK_START_QUERY = "SELECT MIN(roll_no) - 1 FROM students"
+CHUNK_END_QUERY = "SELECT roll_no FROM students WHERE roll_no > %s ORDER BY roll_no LIMIT 1 OFFSET %s"
+RANGE_QUERY = (f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students "
+               "WHERE roll_no > %s AND roll_no <= %s ORDER BY roll_no")
+
+
+def chunk_bounds(chunk_size=BULK_BATCH_SIZE):
+    """Yield ``(after_roll_no, last_roll_no)`` ranges of up to ``chunk_size`` students covering the table.
+
+    Each bound is one seek along the primary key, so the ranges can be
+    handed out before any row is read; the last range ends at MAX_ROLL_NO.
+    """
+    with get_pool().connection() as conn:
+        after_roll_no = run_prepared(conn, CHUNK_START_QUERY)[0][0]
+        while after_roll_no is not None:
+            rows = run_prepared(conn, CHUNK_END_QUERY, (after_roll_no, chunk_size - 1))
+            if not rows:
+                yield after_roll_no, MAX_ROLL_NO
+                return
+            yield after_roll_no, rows[0][0]
+            after_roll_no = rows[0][0]
+
+
+def fetch_range(after_roll_no, last_roll_no=MAX_ROLL_NO):
+    """Return the students with ``after_roll_no < roll_no <= last_roll_no``."""
+    with metrics.timed("GetRange") as timer, get_pool().connection() as conn:
+        rows = run_prepared(conn, RANGE_QUERY, (after_roll_no, last_roll_no))
+        timer.rows = len(rows)
+    return rows
+
+
+def find_duplicates(column):
+    """Yield ``(value, count, roll_nos)`` for each ``column`` value held by more than one student.
+
+    The grouping runs in MySQL along the column's index and the groups are
+    streamed, so memory use does not grow with the table.
+    """
+    if column not in STUDENT_COLUMNS:
+        raise ValueError(f"Cannot group by {column!r}")
+    sql = (f"SELECT {column}, COUNT(*), GROUP_CONCAT(roll_no ORDER BY roll_no) FROM students "
+           f"WHERE {column} <> '' GROUP BY {column} HAVING COUNT(*) > 1")
+    with metrics.timed("Duplicates", column), get_pool().connection() as conn:
+        with closing(conn.cursor()) as cursor:
+            cursor.execute("SET SESSION group_concat_max_len = 16777216")  # the default cuts lists at 1 KB
+            cursor.execute(sql)
+            for value, count, roll_nos in cursor:
+                yield value, count, [int(roll_no) for roll_no in roll_nos.split(",")]
+
+
+def export_students(path, fmt=None, batch_size=BULK_BATCH_SIZE, students=None):
+    """Write the students table to a CSV or JSONL file without loading it all into memory.
+
+    ``students`` writes those rows instead of the table, e.g. a
+    module_records.StudentStore already held in memory. Returns the number
+    of rows written.
+    """
+    rows = iter_students(batch_size) if students is None else students
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if _file_format(path, fmt) == "jsonl":
+            for row in rows:
+                f.write(json.dumps(dict(zip(STUDENT_COLUMNS, row)), default=str) + "\n")
+                count += 1
+        else:
+            writer = csv.writer(f)
+            writer.writerow(STUDENT_COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def _like_prefix(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def fetch_listing(sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE,
+                  use_cache=True):
+    """Return one keyset page of students matching ``filters``, sorted by ``sort_column``.
+
+    See build_listing_query for ``after`` and ``filters``.
+    """
+    sql, params = build_listing_query(sort_column, descending, after, filters, limit)
+    key = ("Listing", sort_column, descending, after, tuple(sorted((filters or {}).items())), limit)
+    if use_cache:
+        rows = query_cache.get(key)
+        if rows is not None:
+            return rows
+        generation = query_cache.generation
+    detail = f"{sort_column} {filters} after={after}"
+    with metrics.timed("Listing", detail) as timer, get_pool().connection() as conn:
+        rows = run_prepared(conn, sql, params)
+        timer.rows = len(rows)
+    if use_cache:
+        query_cache.put(key, rows, listing_predicate(filters), generation)
+    return rows
+
+
+def build_search_query(column, query, mode="prefix", limit=PAGE_SIZE):
+    """Build the SQL for find_students as ``(sql, params)``.
+
+    Modes:
+      exact     ``column = query``
+      prefix    ``column LIKE 'query%'``, a range scan on the column's index
+      substring words inside name or address, via the ngram FULLTEXT indexes
+      range     ``query`` is an inclusive ``(start, end)`` pair, e.g. for dob
+    """
+    if column not in STUDENT_COLUMNS:
+        raise ValueError(f"Cannot search by {column!r}")
+    select = f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students"
+    order = f" ORDER BY {column}, roll_no LIMIT %s"
+    if mode == "substring" and column in ("name", "address") and len(query) >= NGRAM_TOKEN_SIZE:
+        phrase = '"' + query.replace('"', " ") + '"'
+        return (f"{select} WHERE MATCH({column}) AGAINST (%s IN BOOLEAN MODE) LIMIT %s",
+                (phrase, limit))
+    if mode == "substring":
+        # No FULLTEXT index applies; fall back to the indexable prefix match
+        mode = "prefix"
+    if mode == "exact":
+        return f"{select} WHERE {column} = %s{order}", (query, limit)
+    if mode == "prefix":
+        return f"{select} WHERE {column} LIKE %s{order}", (_like_prefix(str(query)), limit)
+    if mode == "range":
+        start, end = query
+        return f"{select} WHERE {column} BETWEEN %s AND %s{order}", (start, end, limit)
+    raise ValueError(f"Unknown search mode {mode!r}")
+
+
+def search_predicate(column, query, mode):
+    """Return a test for whether a row could appear in a find_students result."""
+    index = STUDENT_COLUMNS.index(column)
+    if mode == "range":
+        start, end = str(query[0]), str(query[1])
+        return lambda row: start <= str(row[index]) <= end
+    folded = _fold(query)
+    if mode == "exact":
+        return lambda row: _fold(row[index]) == folded
+    if mode == "prefix":
+        return lambda row: _fold(row[index]).startswith(folded)
+    return lambda row: folded in _fold(row[index])
+
+
+def find_students(column, query, mode="prefix", limit=PAGE_SIZE, use_cache=True):
+    """Search students by one column using the indexes created in setup_database."""
+    sql, params = build_search_query(column, query, mode, limit)
+    key = ("Search", column, query, mode, limit)
+    if use_cache:
+        rows = query_cache.get(key)
+        if rows is not None:
+            return rows
+        generation = query_cache.generation
+    with metrics.timed("Search", f"{column} {mode} {query!r}") as timer, get_pool().connection() as conn:
+        rows = run_prepared(conn, sql, params)
+        timer.rows = len(rows)
+    if use_cache:
+        query_cache.put(key, rows, search_predicate(column, query, mode), generation)
+    return rows
 
 
+def explain_search(column, query, mode="prefix"):
+    """Return MySQL's EXPLAIN plan for a find_students query as a list of dicts."""
+    sql, params = build_search_query(column, query, mode)
+    with get_pool().connection() as conn:
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            cursor.execute("EXPLAIN " + sql, params)
+            return cursor.fetchall()
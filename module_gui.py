@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from tkcalendar import DateEntry
-from module_database import setup_database, execute_stored_procedure
-from module_validate import validate_email,validate_contact
+import module_service
+from module_service import ValidationError, validate_student, PAGE_SIZE, QUEUED
+from module_database import STUDENT_COLUMNS, SORT_COLUMNS, listing_key
+from module_tasks import BackgroundRunner
+from module_live_search import LiveSearch
+from module_change_feed import CHANGE_POLL_MS, RELOAD, ChangeFeed
+from module_tree import StudentRows
 
 def update_clock():
     current_time = datetime.now().strftime("%H:%M:%S")
@@ -35,117 +39,286 @@ def clear_fields():
 def on_tree_select(root):
     try:
         selected_item = tree.selection()[0]
-        values = tree.item(selected_item, "values")
-        roll_var.set(values[1])
-        name_var.set(values[0])
-        email_var.set(values[2])
-        gender_var.set(values[3])
-        contact_var.set(values[4])
-        dob_entry.set_date(values[5])
-        address_text.delete("1.0", "end")
-        address_text.insert("1.0", values[6])
-        roll_entry.config(state="disabled")
     except IndexError:
-        pass
+        return
+    student = tree_rows.get(int(selected_item))
+    roll_var.set(student.roll_no)
+    name_var.set(student.name)
+    email_var.set(student.email)
+    gender_var.set(student.gender)
+    contact_var.set(student.contact)
+    dob_entry.set_date(student.dob)
+    address_text.delete("1.0", "end")
+    address_text.insert("1.0", student.address)
+    roll_entry.config(state="disabled")
+
+def show_db_error(error):
+    messagebox.showerror("Error", f"An error occurred: {error}")
+
+SEARCH_COLUMNS = {
+    "Roll No": "roll_no",
+    "Name": "name",
+    "DOB": "dob",
+    "Email": "email",
+    "Gender": "gender" }
+
+def show_search_results(rows):
+    global all_pages_loaded, page_loading
+    all_pages_loaded = True
+    page_loading = False
+    tree_rows.replace(rows, ordered=False)
 
 def search_students():
-    search_by = search_var.get()
-    search_query = search_entry.get()
-    if not search_query:
-        messagebox.showerror("Error", "Please enter a value to search.")
-        return
-    query_map = {
-        "Roll No": "roll_no",
-        "Name": "name",
-        "DOB": "dob",
-        "Email": "email",
-        "Gender": "gender" }
-    column = query_map.get(search_by)
-    if not column:
-        messagebox.showerror("Error", "Invalid search criterion.")
-        return
-    for row in tree.get_children():
-        tree.delete(row)
+    column = SEARCH_COLUMNS.get(search_var.get())
     try:
-        args = ('Search', None, None, None, None, None, None, None, column, search_query)
-        results = execute_stored_procedure("ManageStudents", args)
-        if results:
-            for result in results:
-                for row in result.fetchall():
-                    tree.insert("", "end", values=row)
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred: {e}")
+        live_search.search_now(column, search_entry.get())
+    except ValidationError as err:
+        messagebox.showerror("Error", str(err))
+
+def on_search_typed(*args):
+    """Search as the user types, once a search column has been picked."""
+    column = SEARCH_COLUMNS.get(search_var.get())
+    if column is not None:
+        live_search.schedule(column, search_text.get())
+
+def form_record():
+    return {"name": name_var.get(), "roll_no": roll_var.get(), "email": email_var.get(), "gender": gender_var.get(),
+            "contact": contact_var.get(), "dob": dob_entry.get(), "address": address_text.get("1.0", "end-1c")}
 
 # Event handlers for adding, updating, deleting, and searching students
 def add_student():
-    if not all([name_var.get(), roll_var.get(), email_var.get(), gender_var.get(), contact_var.get(), dob_entry.get(), address_text.get("1.0", "end-1c").strip()]):
-        messagebox.showerror("Error", "All fields are required")
-        return
+    record = form_record()
     try:
-        roll_no = int(roll_var.get())
-    except ValueError:
-        messagebox.showerror("Error", "Roll No must be an integer")
+        row = validate_student(record)
+    except ValidationError as err:
+        messagebox.showerror("Error", str(err))
         return
-    if not (validate_contact(contact_var.get())):
-        messagebox.showerror("Error", "Contact No must be at least 10 digits")
+
+    def on_added(added):
+        if added == QUEUED:
+            show_queued_write(row)
+        elif added:
+            messagebox.showinfo("Success", "Student added successfully")
+            show_changed_row(row)
+            clear_fields()
+        else:
+            messagebox.showerror("Error", "Failed to add student")
+    runner.submit(module_service.add_student, record, on_success=on_added, on_error=show_db_error)
+
+# Keyset paging state for the "Show All" listing; sorting and filtering
+# happen in the database, so only the shown pages are ever fetched
+last_loaded_key = None
+all_pages_loaded = True
+page_loading = False
+listing_sort = "roll_no"
+listing_descending = False
+listing_filters = {}
+
+def fetch_students():
+    global last_loaded_key, all_pages_loaded
+    live_search.cancel()
+    last_loaded_key = None
+    all_pages_loaded = False
+    load_next_page(replace=True)
+
+def sort_by(column):
+    """Sort the listing by ``column``; clicking the sorted column again reverses it."""
+    global listing_sort, listing_descending
+    listing_descending = column == listing_sort and not listing_descending
+    listing_sort = column
+    for heading, student_column in zip(columns, STUDENT_COLUMNS):
+        arrow = (" \u25bc" if listing_descending else " \u25b2") if student_column == listing_sort else ""
+        tree.heading(heading, text=heading + arrow)
+    fetch_students()
+
+def apply_filters():
+    global listing_filters
+    gender = filter_gender_var.get()
+    try:
+        listing_filters = module_service.prepare_filters({
+            "gender": "" if gender == "Any" else gender,
+            "dob": (filter_dob_from_var.get(), filter_dob_to_var.get()),
+            "email_domain": filter_domain_var.get()})
+    except ValidationError as err:
+        messagebox.showerror("Error", str(err))
         return
-    if not validate_email(email_var.get()):
-        messagebox.showerror("Error", "Invalid email format")
+    fetch_students()
+
+def clear_filters():
+    global listing_filters
+    filter_gender_var.set("Any")
+    for var in (filter_dob_from_var, filter_dob_to_var, filter_domain_var):
+        var.set("")
+    listing_filters = {}
+    fetch_students()
+
+def load_next_page(replace=False):
+    """Fetch the next page of students in the background and append it to the tree.
+
+    With ``replace`` the tree is cleared once the first page arrives, which
+    also supersedes any page or search still in flight.
+    """
+    global page_loading
+    if all_pages_loaded or (page_loading and not replace):
         return
-    args = ('Add', name_var.get(), roll_no, email_var.get(), gender_var.get(), contact_var.get(), dob_entry.get(), address_text.get("1.0", "end-1c"), None, None)
-    print(f"Calling stored procedure with args: {args}")  # Debugging output
-    results = execute_stored_procedure("ManageStudents", args)
-    print(f"Results from stored procedure: {results}")  # Debugging output
-    messagebox.showinfo("Success", "Student added successfully")
-    if results:
-        messagebox.showinfo("Success", "Student added successfully")
-        fetch_students()
-        clear_fields()
-        # messagebox.showinfo("Success", "Student added successfully")
+    page_loading = True
+
+    def on_page(rows):
+        global last_loaded_key, all_pages_loaded, page_loading
+        page_loading = False
+        if replace:
+            # Only the plain roll_no listing can take new rows at their bisected position
+            tree_rows.replace(rows, ordered=listing_sort == "roll_no" and not listing_descending and not listing_filters)
+        else:
+            tree_rows.append(rows)
+        if rows:
+            last_loaded_key = listing_key(rows[-1], listing_sort)
+        all_pages_loaded = len(rows) < PAGE_SIZE
+
+    def on_page_error(error):
+        global page_loading
+        page_loading = False
+        show_db_error(error)
+    runner.submit(module_service.browse_students, listing_sort, listing_descending, last_loaded_key, listing_filters,
+                  on_success=on_page, on_error=on_page_error, channel="tree")
+
+def show_queued_write(row=None, deleted_roll_no=None):
+    """Show a write the database could not take yet as if it had been applied."""
+    if deleted_roll_no is not None:
+        tree_rows.remove(deleted_roll_no)
+        live_search.reset()
     else:
-        messagebox.showerror("Error", "Failed to add student")
-def fetch_students():
-    for row in tree.get_children():
-        tree.delete(row)
-    results = execute_stored_procedure("ManageStudents", ('GetAll', None, None, None, None, None, None, None, None, None))
-    if results:
-        for result in results:
-            for row in result.fetchall():
-                tree.insert("", "end", values=row)
+        show_changed_row(row)
+    clear_fields()
+    messagebox.showinfo("Saved offline", "The database is unreachable; the change was saved and will be applied when it is back")
+
+def show_changed_row(row):
+    """Patch one added or updated student into the tree without reloading it."""
+    # Rows past the last loaded page arrive with the next page instead
+    in_loaded_range = all_pages_loaded or (last_loaded_key is not None and row[1] < last_loaded_key[1])
+    tree_rows.upsert(row, in_loaded_range)
+    live_search.reset()
+
+def poll_changes():
+    """Patch other clients' adds, updates and deletes into the tree, then poll again."""
+    def on_changes(changed):
+        if changed == RELOAD:
+            fetch_students()
+            root.after(CHANGE_POLL_MS, poll_changes)
+            return
+        for roll_no, row in changed.items():
+            if row is None:
+                tree_rows.remove(roll_no)
+            else:
+                show_changed_row(row)
+        if changed:
+            live_search.reset()
+        root.after(CHANGE_POLL_MS, poll_changes)
+    runner.submit(change_feed.poll, on_success=on_changes, on_error=lambda error: root.after(CHANGE_POLL_MS, poll_changes),
+                  channel="changes", quiet=True)
+
+def on_tree_scroll(first, last):
+    scroll_y.set(first, last)
+    # Fetch more rows once the user scrolls into the last tenth of what is loaded
+    if float(last) > 0.9:
+        load_next_page()
 
 def update_student():
-    if not all([name_var.get(), roll_var.get(), email_var.get(), gender_var.get(), contact_var.get(), dob_entry.get(), address_text.get("1.0", "end-1c").strip()]):
+    record = form_record()
+    if not all(value.strip() for value in record.values()):
         messagebox.showerror("Error", "No fields are selected")
         return
-    if not validate_email(email_var.get()):
-        messagebox.showerror("Error", "Invalid email format")
-        return
-    if not (contact_var.get().isdigit() and len(contact_var.get()) >= 10):
-        messagebox.showerror("Error", "Contact No must be at least 10 digits")
+    try:
+        row = validate_student(record)
+    except ValidationError as err:
+        messagebox.showerror("Error", str(err))
         return
-    args = ('Update', name_var.get(), int(roll_var.get()), email_var.get(), gender_var.get(), contact_var.get(), dob_entry.get(), address_text.get("1.0", "end-1c"), None, None)
-    results = execute_stored_procedure("ManageStudents", args)
-    if results:
-        fetch_students()
-        clear_fields()
-        messagebox.showinfo("Success", "Student updated successfully")
+
+    def on_updated(updated):
+        if updated == QUEUED:
+            show_queued_write(row)
+        elif updated:
+            show_changed_row(row)
+            clear_fields()
+            messagebox.showinfo("Success", "Student updated successfully")
+    # The row as the user saw it, so a queued update can detect a concurrent change
+    expected = tree_rows.get(row[1])
+    runner.submit(module_service.update_student, record, expected, on_success=on_updated, on_error=show_db_error)
 
 def delete_student():
     try:
-        args = ('Delete', None, int(roll_var.get()), None, None, None, None, None, None, None)
-        results = execute_stored_procedure("ManageStudents", args)
-        if results:
-            fetch_students()
+        roll_no = int(roll_var.get())
+    except ValueError:
+        messagebox.showerror("Error", "No student selected")
+        return
+
+    def on_deleted(deleted):
+        if deleted == QUEUED:
+            show_queued_write(deleted_roll_no=roll_no)
+        elif deleted:
+            tree_rows.remove(roll_no)
+            live_search.reset()
             clear_fields()
             messagebox.showinfo("Success", "Student deleted successfully")
+    runner.submit(module_service.delete_student, roll_no, tree_rows.get(roll_no), on_success=on_deleted,
+                  on_error=show_db_error)
+
+def on_busy_change(busy):
+    status_label.config(text="Loading..." if busy else "")
+    root.config(cursor="watch" if busy else "")
+
+def show_connect_error(error):
+    messagebox.showerror("Error", f"Error connecting to the database: {error}")
+
+def load_date_picker():
+    """Swap the plain D.O.B entry for a tkcalendar DateEntry.
+
+    tkcalendar pulls in babel and takes longer to import than the rest of
+    the window takes to build, so it is loaded once the window is on screen.
+    """
+    global dob_entry
+    from tkcalendar import DateEntry
+    value = dob_entry.get()
+    dob_entry.destroy()
+    dob_entry = DateEntry(left_frame, font=("Arial", 12), date_pattern="yyyy-mm-dd")
+    try:
+        dob_entry.set_date(value)
     except ValueError:
-        messagebox.showerror("Error", "No student selected")
+        dob_entry.set_date(datetime.now().date())
+    dob_entry.grid(row=6, column=1, pady=5)
+    dob_entry.lower(address_text)  # keep its place in the Tab order
+
+def start():
+    """Paint the window first, then connect and load the first page in the background."""
+    update_clock()
+    root.update()
+    root.after_idle(load_date_picker)
+    def connect():
+        module_service.setup_storage()
+        change_feed.start()
+
+    def on_connected(_):
+        fetch_students()
+        root.after(CHANGE_POLL_MS, poll_changes)
+    runner.submit(connect, on_success=on_connected, on_error=show_connect_error)
+
+class PlainDateEntry(tk.Entry):
+    """Stand-in for DateEntry until load_date_picker replaces it."""
+    def __init__(self, master, **options):
+        self.text = tk.StringVar(master)
+        super().__init__(master, textvariable=self.text, **options)
+
+    def set_date(self, value):
+        self.text.set(str(value))
 
 # Main application setup
-setup_database()
 root = tk.Tk()
 root.title("Student Management System")
 root.state("zoomed")
+runner = BackgroundRunner(root, on_busy_change=on_busy_change)
+live_search = LiveSearch(root, runner, on_results=show_search_results, on_empty=fetch_students,
+                         on_error=show_db_error)
+change_feed = ChangeFeed()
 
 # Clock Label
 clock_label = tk.Label(root, font=("Arial", 14), bg="lightgray", fg="black")
@@ -186,7 +359,7 @@ gender_menu = ttk.Combobox(left_frame, textvariable=gender_var, values=["Male",
 gender_menu.grid(row=5, column=1, pady=5)
 
 tk.Label(left_frame, text="D.O.B:", font=("Arial", 12), bg="lightgray").grid(row=6, column=0, sticky=tk.W, pady=5)
-dob_entry = DateEntry(left_frame, font=("Arial", 12), date_pattern="yyyy-mm-dd")
+dob_entry = PlainDateEntry(left_frame, font=("Arial", 12))
 dob_entry.set_date(datetime.now().date())
 dob_entry.grid(row=6, column=1, pady=5)
 
@@ -219,29 +392,58 @@ search_frame.pack(pady=5)
 search_var = tk.StringVar(value="Click here")
 search_menu = ttk.Combobox(search_frame, textvariable=search_var, values=["Roll No", "Name", "DOB", "Email", "Gender"], state="readonly", font=("Arial", 12))
 search_menu.grid(row=0, column=0, padx=5)
+search_menu.bind("<<ComboboxSelected>>", on_search_typed)
 
-search_entry = tk.Entry(search_frame, font=("Arial", 12))
+search_text = tk.StringVar()
+search_text.trace_add("write", on_search_typed)
+search_entry = tk.Entry(search_frame, font=("Arial", 12), textvariable=search_text)
 search_entry.grid(row=0, column=1, padx=5)
 
 btn_search_all = tk.Button(search_frame, text="Search All", font=("Arial", 12), command=search_students, bg="purple", fg="white")
 btn_search_all.grid(row=0, column=2, padx=5)
 
+# Filter Section
+filter_frame = tk.Frame(right_frame, bg="lightblue")
+filter_frame.pack(pady=5)
+
+tk.Label(filter_frame, text="Gender:", font=("Arial", 12), bg="lightblue").grid(row=0, column=0, padx=2)
+filter_gender_var = tk.StringVar(value="Any")
+ttk.Combobox(filter_frame, textvariable=filter_gender_var, values=["Any", "Male", "Female"], state="readonly", width=7, font=("Arial", 12)).grid(row=0, column=1, padx=2)
+tk.Label(filter_frame, text="D.O.B from:", font=("Arial", 12), bg="lightblue").grid(row=0, column=2, padx=2)
+filter_dob_from_var = tk.StringVar()
+tk.Entry(filter_frame, textvariable=filter_dob_from_var, width=11, font=("Arial", 12)).grid(row=0, column=3, padx=2)
+tk.Label(filter_frame, text="to:", font=("Arial", 12), bg="lightblue").grid(row=0, column=4, padx=2)
+filter_dob_to_var = tk.StringVar()
+tk.Entry(filter_frame, textvariable=filter_dob_to_var, width=11, font=("Arial", 12)).grid(row=0, column=5, padx=2)
+tk.Label(filter_frame, text="Email domain:", font=("Arial", 12), bg="lightblue").grid(row=0, column=6, padx=2)
+filter_domain_var = tk.StringVar()
+tk.Entry(filter_frame, textvariable=filter_domain_var, width=12, font=("Arial", 12)).grid(row=0, column=7, padx=2)
+tk.Button(filter_frame, text="Filter", font=("Arial", 12), command=apply_filters, bg="purple", fg="white").grid(row=0, column=8, padx=2)
+tk.Button(filter_frame, text="Clear", font=("Arial", 12), command=clear_filters, bg="orange", fg="black").grid(row=0, column=9, padx=2)
+
 btn_show_all = tk.Button(right_frame, text="Show All", font=("Arial", 12), command=fetch_students, bg="green", fg="white")
 btn_show_all.pack(pady=5)
 
+status_label = tk.Label(right_frame, text="", font=("Arial", 12, "italic"), bg="lightblue")
+status_label.pack()
+
 columns = ("Name", "Roll No", "Email", "Gender", "Contact", "DOB", "Address")
 tree = ttk.Treeview(right_frame, columns=columns, show="headings")
-for col in columns:
-    tree.heading(col, text=col)
+for col, student_column in zip(columns, STUDENT_COLUMNS):
+    if student_column in SORT_COLUMNS:
+        tree.heading(col, text=col, command=lambda column=student_column: sort_by(column))
+    else:
+        tree.heading(col, text=col)
     tree.column(col, width=120, anchor=tk.CENTER)
 tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+tree_rows = StudentRows(tree)
 
 # Scrollbars
 scroll_x = tk.Scrollbar(right_frame, orient="horizontal", command=tree.xview)
 scroll_y = tk.Scrollbar(right_frame, orient="vertical", command=tree.yview)
-tree.configure(xscrollcommand=scroll_x.set)
+tree.configure(xscrollcommand=scroll_x.set, yscrollcommand=on_tree_scroll)
 scroll_x.pack(side="bottom", fill="x")
+scroll_y.pack(side="right", fill="y")
 
 # Bind treeview selection event
-tree.bind("<<TreeviewSelect>>", on_tree_select)
-fetch_students()
\ No newline at end of file
+tree.bind("<<TreeviewSelect>>", on_tree_select)
\ No newline at end of file
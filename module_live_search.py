@@ -0,0 +1,111 @@
+"""Search-as-you-type for the student tree.
+
+Keystrokes are debounced: a search runs only once typing has paused for
+SEARCH_DEBOUNCE_MS. Searches go through BackgroundRunner on one channel, so
+a newer query supersedes any still in flight and only the latest results
+reach the tree.
+
+When a new query extends the previous one (typing "Jo" then "Joh") and the
+previous results were complete, the new results are a subset of them and
+are filtered locally instead of asking the database again.
+"""
+import module_service
+from module_database import PAGE_SIZE, search_predicate
+from module_records import StudentStore
+
+SEARCH_DEBOUNCE_MS = 250
+# Substring queries shorter than this may be run as prefix matches by the
+# MySQL backend (see build_search_query), so they cannot be narrowed.
+MIN_NARROWING_SUBSTRING = 2
+
+
+class LiveSearch:
+    """Debounce, coalesce and locally narrow searches typed into the GUI.
+
+    ``on_results(rows)`` receives each result set on the Tk thread;
+    ``on_empty()`` is called instead when the query is cleared.
+    """
+
+    def __init__(self, root, runner, on_results, on_empty=None, on_error=None,
+                 delay_ms=SEARCH_DEBOUNCE_MS, limit=PAGE_SIZE, channel="tree"):
+        self.root = root
+        self.runner = runner
+        self.on_results = on_results
+        self.on_empty = on_empty
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.limit = limit
+        self.channel = channel
+        self._after_id = None
+        self._pending = None
+        self._last = None     # (column, query) most recently run
+        self._base = None     # (column, query, mode, StudentStore) of the last complete database result
+        self.round_trips = 0
+        self.narrowed = 0
+
+    def schedule(self, column, query):
+        """Search for ``query`` once typing pauses; repeated calls restart the wait."""
+        self._pending = (column, query)
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = None
+        self._pending = None
+
+    def reset(self):
+        """Forget previous results, e.g. after a student was added, changed or deleted."""
+        self._base = None
+        self._last = None
+
+    def _fire(self):
+        self._after_id = None
+        column, query = self._pending
+        self._pending = None
+        if (column, query) == self._last:
+            return
+        try:
+            self.search_now(column, query)
+        except module_service.ValidationError:
+            pass  # half-typed input; wait for more keystrokes
+
+    def search_now(self, column, query):
+        """Run a search immediately; raises ValidationError for a bad request."""
+        self.cancel()
+        self._last = (column, query)
+        if not query.strip():
+            if self.on_empty:
+                self.on_empty()
+            return
+        column, resolved, mode = module_service.prepare_search(column, query)
+        rows = self._narrow(column, resolved, mode)
+        if rows is not None:
+            self.narrowed += 1
+            # Supersede any database search still in flight
+            self.runner.submit(lambda: rows, on_success=self.on_results, channel=self.channel)
+            return
+
+        def on_rows(rows):
+            if len(rows) < self.limit:
+                self._base = (column, resolved, mode, StudentStore(rows))
+            else:
+                self._base = None
+            self.on_results(rows)
+        self.round_trips += 1
+        self.runner.submit(module_service.search_students, column, resolved, mode, self.limit,
+                           on_success=on_rows, on_error=self.on_error, channel=self.channel)
+
+    def _narrow(self, column, query, mode):
+        """Filter the last complete result down to ``query``, or None if it may miss rows."""
+        if self._base is None or mode not in ("prefix", "substring"):
+            return None
+        base_column, base_query, base_mode, students = self._base
+        if base_column != column or base_mode != mode or not query.startswith(base_query):
+            return None
+        if mode == "substring" and len(base_query) < MIN_NARROWING_SUBSTRING:
+            return None
+        matches = search_predicate(column, query, mode)
+        return [student for student in students if matches(student)]
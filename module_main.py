@@ -1,7 +1,57 @@
+import argparse
+from module_metrics import METRICS_DUMP_INTERVAL, SLOW_QUERY_THRESHOLD, configure_metrics, start_metrics_dump
+from module_storage import BACKENDS, DEFAULT_SQLITE_PATH, configure_backend
+from module_write_queue import DEFAULT_JOURNAL_PATH
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student Management System")
+    parser.add_argument("--server", action="store_true", help="run the headless HTTP/JSON API instead of the GUI")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --server to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port for --server to listen on")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="storage engine (default: $STUDENTS_BACKEND or mysql)")
+    parser.add_argument("--db-path", default=DEFAULT_SQLITE_PATH, help="database file for the sqlite backend")
+    parser.add_argument("--metrics", action="store_true", help="record database call metrics")
+    parser.add_argument("--metrics-file", help="write metrics to this Prometheus text file periodically")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_DUMP_INTERVAL,
+                        help="seconds between --metrics-file dumps")
+    parser.add_argument("--slow-query-ms", type=float, default=SLOW_QUERY_THRESHOLD * 1000,
+                        help="log database calls slower than this when metrics are on")
+    parser.add_argument("--slow-query-log", help="file for the slow-query log (default: stderr)")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="batch writes through a local journal and keep them while the database is down")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="journal file for --write-behind")
+    parser.add_argument("--audit", metavar="REPORT", help="check every stored student, write problems to REPORT and exit")
+    parser.add_argument("--audit-workers", type=int, default=None, help="processes for --audit (default: one per core)")
+    args = parser.parse_args(argv)
+    if args.metrics or args.metrics_file or args.slow_query_log:
+        configure_metrics(slow_query_threshold=args.slow_query_ms / 1000, slow_query_file=args.slow_query_log)
+        if args.metrics_file:
+            start_metrics_dump(args.metrics_file, args.metrics_interval)
+    if args.backend == "sqlite":
+        configure_backend("sqlite", path=args.db_path)
+    elif args.backend:
+        configure_backend(args.backend)
+    if args.audit:
+        from module_audit import audit_students
+        summary = audit_students(args.audit, args.audit_workers)
+        print(f"Checked {summary.pop('rows')} students")
+        for problem, count in sorted(summary.items()):
+            print(f"  {problem}: {count}")
+        return
+    if args.write_behind:
+        import module_service
+        module_service.configure_write_queue(args.journal)
+    if args.server:
+        from module_server import serve
+        serve(args.host, args.port)
+    else:
+        # Importing module_gui builds the window, so only do it when the GUI is wanted
+        from module_gui import root, start
+        start()
+        root.mainloop()
 
-from module_gui import root, fetch_students, update_clock
 
 if __name__ == "__main__":
-    update_clock()
-    fetch_students()
-    root.mainloop()
+    main()
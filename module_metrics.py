@@ -0,0 +1,233 @@
+"""Instrumentation for database calls.
+
+Every database round trip is wrapped in ``metrics.timed(action)``, which
+records per-action call counts, a latency histogram, rows returned and
+errors; the connection pool reports how long callers waited for a
+connection. Recording is off until ``configure_metrics(enabled=True)``, and
+while off ``timed`` hands back a shared no-op so the cost is one attribute
+check per call.
+
+The numbers can be read with ``metrics.snapshot()``, written as a Prometheus
+text file (once with ``write_prometheus`` or periodically with
+``start_metrics_dump``), and calls slower than ``slow_query_threshold``
+seconds are logged to the "students.slow_queries" logger.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_QUERY_THRESHOLD = 0.5  # seconds
+METRICS_DUMP_INTERVAL = 15  # seconds between periodic Prometheus dumps
+
+slow_query_log = logging.getLogger("students.slow_queries")
+
+
+class Histogram:
+    """Latency histogram over LATENCY_BUCKETS plus an overflow bucket."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, p):
+        """Estimate the ``p``-th percentile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+
+class _ActionStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors = 0
+
+
+class _Timer:
+    """Times one call; set ``rows`` before the block ends to record rows returned."""
+
+    __slots__ = ("metrics", "action", "detail", "rows", "start")
+
+    def __init__(self, metrics, action, detail):
+        self.metrics = metrics
+        self.action = action
+        self.detail = detail
+        self.rows = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.action, time.perf_counter() - self.start, self.rows,
+                            error=exc_type is not None, detail=self.detail)
+        return False
+
+
+class _NullTimer:
+    # One instance is shared by every thread while metrics are off: callers
+    # may set ``rows`` on it but must never read a result back.
+    __slots__ = ("rows",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled=False, slow_query_threshold=SLOW_QUERY_THRESHOLD):
+        self.enabled = enabled
+        self.slow_query_threshold = slow_query_threshold
+        self._actions = {}
+        self._acquire = Histogram()
+        self._lock = threading.Lock()
+
+    def timed(self, action, detail=None):
+        """Context manager timing one database call for ``action``.
+
+        ``detail`` (e.g. the SQL or the search arguments) only appears in the
+        slow-query log.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, action, detail)
+
+    def record(self, action, seconds, rows=0, error=False, detail=None):
+        with self._lock:
+            stats = self._actions.get(action)
+            if stats is None:
+                stats = self._actions[action] = _ActionStats()
+            stats.latency.observe(seconds)
+            stats.rows += rows
+            stats.errors += error
+        if self.slow_query_threshold is not None and seconds >= self.slow_query_threshold:
+            slow_query_log.warning("slow %s: %.1f ms, %d rows%s%s", action, seconds * 1000, rows,
+                                   " (failed)" if error else "", f": {detail}" if detail else "")
+
+    def record_acquire(self, seconds):
+        """Record how long a caller waited for a pooled connection."""
+        if self.enabled:
+            with self._lock:
+                self._acquire.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._actions = {}
+            self._acquire = Histogram()
+
+    def snapshot(self):
+        """Return the counters as plain data, latencies in milliseconds."""
+        def summary(histogram):
+            return {"count": histogram.count, "total_ms": histogram.sum * 1000,
+                    "p50_ms": histogram.percentile(50) * 1000, "p95_ms": histogram.percentile(95) * 1000,
+                    "p99_ms": histogram.percentile(99) * 1000}
+
+        with self._lock:
+            actions = {action: dict(summary(stats.latency), rows=stats.rows, errors=stats.errors)
+                       for action, stats in sorted(self._actions.items())}
+            return {"actions": actions, "connection_acquire": summary(self._acquire)}
+
+    def prometheus_text(self):
+        """Render the counters in the Prometheus text exposition format."""
+        lines = []
+
+        def histogram_lines(name, histogram, labels):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.sum}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        with self._lock:
+            lines.append("# HELP students_db_call_seconds Latency of database calls by action.")
+            lines.append("# TYPE students_db_call_seconds histogram")
+            for action, stats in sorted(self._actions.items()):
+                histogram_lines("students_db_call_seconds", stats.latency, f'action="{action}",')
+            for name, attr, help_text in (("students_db_rows_total", "rows", "Rows returned by database calls."),
+                                          ("students_db_errors_total", "errors", "Database calls that raised.")):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for action, stats in sorted(self._actions.items()):
+                    lines.append(f'{name}{{action="{action}"}} {getattr(stats, attr)}')
+            lines.append("# HELP students_db_connection_acquire_seconds Time spent waiting for a pooled connection.")
+            lines.append("# TYPE students_db_connection_acquire_seconds histogram")
+            histogram_lines("students_db_connection_acquire_seconds", self._acquire, "")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() to ``path`` atomically, e.g. for node_exporter's textfile collector."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+
+_dump_thread = None
+_dump_stop = threading.Event()
+
+
+def configure_metrics(enabled=True, slow_query_threshold=SLOW_QUERY_THRESHOLD, slow_query_file=None):
+    """Turn recording on or off; ``slow_query_threshold=None`` disables the slow-query log.
+
+    ``slow_query_file`` sends the slow-query log to a file instead of the
+    default logging configuration.
+    """
+    metrics.enabled = enabled
+    metrics.slow_query_threshold = slow_query_threshold
+    if slow_query_file:
+        handler = logging.FileHandler(slow_query_file)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_log.addHandler(handler)
+        slow_query_log.propagate = False
+    return metrics
+
+
+def start_metrics_dump(path, interval=METRICS_DUMP_INTERVAL):
+    """Rewrite the Prometheus file at ``path`` every ``interval`` seconds until stop_metrics_dump()."""
+    global _dump_thread
+    stop_metrics_dump()
+    _dump_stop.clear()
+
+    def run():
+        while not _dump_stop.wait(interval):
+            metrics.write_prometheus(path)
+        metrics.write_prometheus(path)
+
+    _dump_thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+    _dump_thread.start()
+
+
+def stop_metrics_dump():
+    """Stop the periodic dump, writing the file one last time."""
+    global _dump_thread
+    if _dump_thread is not None:
+        _dump_stop.set()
+        _dump_thread.join()
+        _dump_thread = None
@@ -0,0 +1,186 @@
+"""Compact in-memory student records.
+
+Database drivers hand rows back as generic tuples holding a separate int,
+date and gender string per student. ``Student`` keeps one record in
+``__slots__`` with the gender interned, and ``StudentStore`` keeps many
+records column by column: roll numbers and dates of birth (as ordinals) in
+typed arrays, genders as small codes into a shared list, and the remaining
+strings in one list per column. Both behave like row tuples (indexing and
+iteration in STUDENT_COLUMNS order), so they can be passed anywhere a row
+is expected.
+"""
+import sys
+from array import array
+from datetime import date
+from operator import attrgetter
+
+from module_database import STUDENT_COLUMNS
+
+_GETTERS = [attrgetter(column) for column in STUDENT_COLUMNS]
+_REMOVED = object()  # name of a removed student's slot in a StudentStore
+
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class Student:
+    """One student, laid out as STUDENT_COLUMNS."""
+
+    __slots__ = STUDENT_COLUMNS
+
+    def __init__(self, name, roll_no, email, gender, contact, dob, address):
+        self.name = name
+        self.roll_no = roll_no
+        self.email = email
+        self.gender = sys.intern(gender) if isinstance(gender, str) else gender
+        self.contact = contact
+        self.dob = _as_date(dob)
+        self.address = address
+
+    @classmethod
+    def from_row(cls, row):
+        return row if isinstance(row, cls) else cls(*row)
+
+    def as_tuple(self):
+        return (self.name, self.roll_no, self.email, self.gender, self.contact, self.dob, self.address)
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __len__(self):
+        return len(STUDENT_COLUMNS)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return _GETTERS[index](self)
+        return self.as_tuple()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Student, tuple)):
+            return self.as_tuple() == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Student{self.as_tuple()!r}"
+
+
+class StudentStore:
+    """Columnar collection of students keyed by roll_no, in insertion order.
+
+    Lookups by roll_no use an index that is built on first use and then
+    kept up to date. A removal only marks the student's slot as free, so
+    it costs the same at any size; the columns are compacted once more
+    than half of the slots are free.
+    """
+
+    def __init__(self, rows=()):
+        self._roll_nos = array("q")
+        self._dobs = array("l")        # date ordinals, 0 for no date
+        self._genders = array("H")     # codes into _gender_values
+        self._gender_values = []
+        self._gender_codes = {}
+        self._names = []
+        self._emails = []
+        self._contacts = []
+        self._addresses = []
+        self._positions = None
+        self._removed = 0
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self._roll_nos) - self._removed
+
+    def __contains__(self, roll_no):
+        return roll_no in self._index()
+
+    def __iter__(self):
+        for position in range(len(self._roll_nos)):
+            if self._names[position] is not _REMOVED:
+                yield self._student(position)
+
+    def _index(self):
+        if self._positions is None:
+            self._positions = {roll_no: position for position, roll_no in enumerate(self._roll_nos)
+                               if self._names[position] is not _REMOVED}
+        return self._positions
+
+    def _gender_code(self, gender):
+        code = self._gender_codes.get(gender)
+        if code is None:
+            code = self._gender_codes[gender] = len(self._gender_values)
+            self._gender_values.append(sys.intern(gender) if isinstance(gender, str) else gender)
+        return code
+
+    def _student(self, position):
+        ordinal = self._dobs[position]
+        return Student(self._names[position], self._roll_nos[position], self._emails[position],
+                       self._gender_values[self._genders[position]], self._contacts[position],
+                       date.fromordinal(ordinal) if ordinal else None, self._addresses[position])
+
+    def _set(self, position, row):
+        name, roll_no, email, gender, contact, dob, address = row
+        dob = _as_date(dob)
+        self._names[position] = name
+        self._emails[position] = email
+        self._genders[position] = self._gender_code(gender)
+        self._contacts[position] = contact
+        self._dobs[position] = dob.toordinal() if dob else 0
+        self._addresses[position] = address
+
+    def append(self, row):
+        """Add ``row`` at the end; the caller makes sure its roll_no is new."""
+        name, roll_no, email, gender, contact, dob, address = row
+        dob = _as_date(dob)
+        if self._positions is not None:
+            self._positions[roll_no] = len(self._roll_nos)
+        self._roll_nos.append(roll_no)
+        self._names.append(name)
+        self._emails.append(email)
+        self._genders.append(self._gender_code(gender))
+        self._contacts.append(contact)
+        self._dobs.append(dob.toordinal() if dob else 0)
+        self._addresses.append(address)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def upsert(self, row):
+        """Replace the student with ``row[1]``, or append it if it is new."""
+        position = self._index().get(row[1])
+        if position is None:
+            self.append(row)
+        else:
+            self._set(position, row)
+
+    def get(self, roll_no):
+        position = self._index().get(roll_no)
+        return None if position is None else self._student(position)
+
+    def remove(self, roll_no):
+        position = self._index().pop(roll_no, None)
+        if position is None:
+            return False
+        self._names[position] = _REMOVED
+        self._emails[position] = self._contacts[position] = self._addresses[position] = None
+        self._removed += 1
+        if self._removed * 2 > len(self._roll_nos):
+            self._compact()
+        return True
+
+    def _compact(self):
+        live = [position for position in range(len(self._roll_nos)) if self._names[position] is not _REMOVED]
+        for name in ("_roll_nos", "_names", "_emails", "_genders", "_contacts", "_dobs", "_addresses"):
+            column = getattr(self, name)
+            kept = [column[position] for position in live]
+            setattr(self, name, array(column.typecode, kept) if isinstance(column, array) else kept)
+        self._removed = 0
+        self._positions = None
+
+    def clear(self):
+        self.__init__()
@@ -0,0 +1,134 @@
+"""Headless JSON-over-HTTP API for the student service.
+
+Routes:
+  GET    /health                                   liveness check, no database access
+  GET    /students?after=<roll_no>&limit=<n>       one keyset page of students
+           &sort=<column>&desc=1&after_value=<v>   ... sorted; after_value is the last row's sort column
+                                                   (after_null=1 instead when it is null)
+           &gender=&dob_from=&dob_to=&email_domain= ... filtered
+  GET    /students/search?column=<c>&q=<query>     search (optional &mode=)
+  POST   /students                                 add (JSON object body)
+  PUT    /students/<roll_no>                       update (JSON object body)
+  DELETE /students/<roll_no>                       delete
+  GET    /changes?since=<version>                  students changed after a change-log version
+  GET    /stats                                    query cache counters
+  GET    /metrics                                  database call metrics, Prometheus text format
+
+With the write-behind queue on, writes the database cannot take yet answer
+202 Accepted and are applied once it is reachable again.
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import module_service
+from module_database import STUDENT_COLUMNS, query_cache
+from module_metrics import metrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+
+class StudentRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json"):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(data, dict):
+            raise module_service.ValidationError("Request body must be a JSON object")
+        return data
+
+    def _send_write(self, result, ok_status, failed_status):
+        if result == module_service.QUEUED:
+            return self._send(202, {"status": "queued"})
+        return self._send(ok_status if result else failed_status, {})
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == "GET" and parts == ["health"]:
+                return self._send(200, {"status": "ok"})
+            if method == "GET" and parts == ["stats"]:
+                return self._send(200, query_cache.stats())
+            if method == "GET" and parts == ["metrics"]:
+                return self._send(200, metrics.prometheus_text(), "text/plain; version=0.0.4")
+            if method == "GET" and parts == ["students"]:
+                sort = params.get("sort", "roll_no")
+                after = None
+                if "after" in params:
+                    after_null = params.get("after_null") == "1"
+                    if sort != "roll_no" and "after_value" not in params and not after_null:
+                        raise module_service.ValidationError("after_value is required when sorting")
+                    after = (None if after_null else params.get("after_value"), int(params["after"]))
+                filters = {"gender": params.get("gender"), "dob": (params.get("dob_from"), params.get("dob_to")),
+                           "email_domain": params.get("email_domain")}
+                rows = module_service.browse_students(sort, params.get("desc") == "1", after, filters,
+                                                      int(params.get("limit", module_service.PAGE_SIZE)))
+                return self._send(200, [dict(zip(STUDENT_COLUMNS, row)) for row in rows])
+            if method == "GET" and parts == ["students", "search"]:
+                rows = module_service.search_students(params.get("column"), params.get("q"), params.get("mode"))
+                return self._send(200, [dict(zip(STUDENT_COLUMNS, row)) for row in rows])
+            if method == "GET" and parts == ["changes"]:
+                changes = module_service.student_changes(int(params.get("since", 0)))
+                return self._send(200, [{"version": version, "roll_no": roll_no,
+                                         "student": dict(zip(STUDENT_COLUMNS, row)) if row else None}
+                                        for version, roll_no, row in changes])
+            if method == "POST" and parts == ["students"]:
+                return self._send_write(module_service.add_student(self._body()), 201, 409)
+            if method == "PUT" and len(parts) == 2 and parts[0] == "students":
+                record = dict(self._body(), roll_no=parts[1])
+                return self._send_write(module_service.update_student(record), 200, 404)
+            if method == "DELETE" and len(parts) == 2 and parts[0] == "students":
+                return self._send_write(module_service.delete_student(parts[1]), 200, 404)
+            self._send(404, {"error": "Not found"})
+        except ValueError as err:
+            # ValidationError, bad query parameters and malformed JSON
+            self._send(400, {"error": str(err)})
+        except Exception as err:
+            self._send(500, {"error": str(err)})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), StudentRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Set up the database and serve the API until interrupted."""
+    module_service.setup_storage()
+    server = make_server(host, port)
+    print(f"Serving student API on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
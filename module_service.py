@@ -0,0 +1,180 @@
+"""Student CRUD and search, independent of any user interface.
+
+Both the Tk GUI and the headless HTTP server call these functions, so they
+share validation rules and the storage backend chosen in module_storage.
+"""
+from datetime import date
+
+from module_database import validate_student_record, CHANGE_BATCH_SIZE, LISTING_FILTERS, PAGE_SIZE, SORT_COLUMNS
+from module_storage import get_backend
+from module_write_queue import DEFAULT_JOURNAL_PATH, WriteBehindQueue
+
+# How each searchable column is matched by default: names anywhere in the
+# name (ngram FULLTEXT), emails by prefix, everything else exactly.
+SEARCH_MODES = {
+    "roll_no": "exact",
+    "name": "substring",
+    "dob": "exact",
+    "email": "prefix",
+    "gender": "exact",
+}
+
+
+# Returned by add/update/delete when the write went to the write-behind queue
+# but could not be applied within WRITE_WAIT seconds (the database is down);
+# it will be applied once the database is back.
+QUEUED = "queued"
+WRITE_WAIT = 2.0
+
+_write_queue = None
+
+
+class ValidationError(ValueError):
+    """Raised when a request is rejected before it reaches the database."""
+
+
+def validate_student(record):
+    """Return the student as a row tuple in STUDENT_COLUMNS order."""
+    try:
+        return validate_student_record(record)
+    except ValueError as err:
+        raise ValidationError(str(err)) from None
+
+
+def setup_storage():
+    """Create the students table and indexes in the configured backend, and
+    prune change-log entries past their retention."""
+    backend = get_backend()
+    backend.setup()
+    backend.prune_changes()
+
+
+def configure_write_queue(journal_path=DEFAULT_JOURNAL_PATH, **options):
+    """Send adds, updates and deletes through a WriteBehindQueue journalled at ``journal_path``.
+
+    Unfinished writes from a previous run are replayed straight away.
+    """
+    global _write_queue
+    close_write_queue()
+    _write_queue = WriteBehindQueue(journal_path, **options).start()
+    return _write_queue
+
+
+def close_write_queue(timeout=None):
+    global _write_queue
+    if _write_queue is not None:
+        _write_queue.close(timeout)
+    _write_queue = None
+
+
+def _write(action, row, expected=None):
+    if _write_queue is None:
+        backend = get_backend()
+        if action == "Add":
+            return backend.add(row)
+        if action == "Update":
+            return backend.update(row)
+        return backend.delete(row[1])
+    future = _write_queue.submit(action, row, expected)
+    try:
+        return future.result(WRITE_WAIT) == "applied"
+    except TimeoutError:
+        return QUEUED
+
+
+def add_student(record):
+    """Add a student; returns False if the backend rejected it, or QUEUED."""
+    return _write("Add", validate_student(record))
+
+
+def update_student(record, expected=None):
+    """Update a student; ``expected`` is the row as the user saw it, so a
+    queued update can tell whether someone else changed it first."""
+    return _write("Update", validate_student(record), expected)
+
+
+def delete_student(roll_no, expected=None):
+    try:
+        roll_no = int(roll_no)
+    except (TypeError, ValueError):
+        raise ValidationError("No student selected") from None
+    return _write("Delete", (None, roll_no, None, None, None, None, None), expected)
+
+
+def list_students(after_roll_no=None, limit=PAGE_SIZE):
+    return get_backend().fetch_page(after_roll_no, limit)
+
+
+def prepare_filters(filters):
+    """Check listing filters and normalise them for fetch_listing; empty values are dropped.
+
+    Accepts ``gender``, ``dob`` as a ``(start, end)`` pair of ISO dates
+    (either may be empty) and ``email_domain`` with or without the "@".
+    """
+    filters = dict(filters or {})
+    unknown = set(filters) - set(LISTING_FILTERS)
+    if unknown:
+        raise ValidationError(f"Cannot filter by {', '.join(sorted(unknown))}")
+    prepared = {}
+    gender = str(filters.get("gender") or "").strip()
+    if gender:
+        prepared["gender"] = gender
+    bounds = []
+    for value in filters.get("dob") or ("", ""):
+        value = str(value or "").strip()
+        try:
+            bounds.append(date.fromisoformat(value).isoformat() if value else None)
+        except ValueError:
+            raise ValidationError("D.O.B must be a YYYY-MM-DD date") from None
+    if any(bounds):
+        prepared["dob"] = tuple(bounds)
+    domain = str(filters.get("email_domain") or "").strip().lstrip("@")
+    if domain:
+        prepared["email_domain"] = domain
+    return prepared
+
+
+def browse_students(sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE):
+    """Return one page of students sorted by ``sort_column`` and narrowed by ``filters``.
+
+    ``after`` is module_database.listing_key() of the last row already shown.
+    """
+    if sort_column not in SORT_COLUMNS:
+        raise ValidationError("Invalid sort column.")
+    filters = prepare_filters(filters)
+    if sort_column == "roll_no" and not descending and not filters:
+        return list_students(after[1] if after else None, limit)
+    return get_backend().fetch_listing(sort_column, descending, after, filters, limit)
+
+
+def change_version():
+    return get_backend().change_version()
+
+
+def student_changes(since, limit=CHANGE_BATCH_SIZE):
+    """Return ``(version, roll_no, row)`` change-log entries after version ``since``."""
+    return get_backend().changes_since(since, limit)
+
+
+def oldest_change_version():
+    return get_backend().oldest_change_version()
+
+
+def prepare_search(column, query, mode=None):
+    """Check a search request and resolve it to ``(column, query, mode)`` for the backend.
+
+    A dob query of the form "2000-01-01 to 2000-12-31" selects a date range.
+    """
+    if not query:
+        raise ValidationError("Please enter a value to search.")
+    if column not in SEARCH_MODES:
+        raise ValidationError("Invalid search criterion.")
+    mode = mode or SEARCH_MODES[column]
+    if column == "dob" and " to " in query:
+        mode = "range"
+        query = tuple(part.strip() for part in query.split(" to ", 1))
+    return column, query, mode
+
+
+def search_students(column, query, mode=None, limit=PAGE_SIZE):
+    return get_backend().search(*prepare_search(column, query, mode), limit)
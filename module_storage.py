@@ -0,0 +1,596 @@
+"""Storage backends for student records.
+
+Every backend offers the same operations (setup, add, update, delete,
+search, get_all, fetch_page and the change feed) on rows laid out as
+STUDENT_COLUMNS.
+MySQLBackend talks to the MySQL server through module_database;
+SQLiteBackend keeps everything in a local SQLite file, which suits a single
+site with no database server and gives the tests real queries to run.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+from datetime import date
+
+import module_database
+from module_database import BULK_BATCH_SIZE, CHANGE_BATCH_SIZE, CHANGE_RETENTION_SECONDS, MAX_ROLL_NO, PAGE_SIZE, STUDENT_COLUMNS
+from module_metrics import metrics
+
+DEFAULT_SQLITE_PATH = "students.db"
+SQLITE_TRIGRAM_SIZE = 3  # FTS5 trigram queries need at least this many characters
+SQLITE_ANALYZE_GROWTH = 0.1  # add_many re-runs ANALYZE when it adds this share of the analyzed rows
+
+
+class StorageBackend:
+    """Interface shared by all storage engines."""
+
+    name = None
+
+    def setup(self):
+        """Create tables and indexes if they do not exist yet."""
+        raise NotImplementedError
+
+    def add(self, row):
+        """Insert a student row; returns False if the roll_no is taken."""
+        raise NotImplementedError
+
+    def update(self, row):
+        """Replace the student with ``row[1]``; returns False if there is none."""
+        raise NotImplementedError
+
+    def delete(self, roll_no):
+        raise NotImplementedError
+
+    def add_many(self, rows, batch_size=BULK_BATCH_SIZE):
+        """Insert many rows, skipping taken roll numbers; returns how many were inserted."""
+        return sum(self.add(row) for row in rows)
+
+    def apply_writes(self, writes):
+        """Apply ``(action, row, expected)`` writes in one transaction.
+
+        ``action`` is Add, Update or Delete; for a delete only ``row[1]`` is
+        used. Returns one outcome per write: "applied", or "conflict" when the
+        row stored under its roll_no rules it out (see write_outcome).
+        """
+        raise NotImplementedError
+
+    def is_transient(self, error):
+        """Whether ``error`` from apply_writes means "try again later" (e.g. the server is down)."""
+        return False
+
+    def search(self, column, query, mode="prefix", limit=PAGE_SIZE):
+        """Search one column; modes are those of module_database.build_search_query."""
+        raise NotImplementedError
+
+    def get_all(self):
+        raise NotImplementedError
+
+    def fetch_page(self, after_roll_no=None, limit=PAGE_SIZE):
+        raise NotImplementedError
+
+    def fetch_listing(self, sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE):
+        """Return one keyset page sorted and filtered as module_database.build_listing_query describes."""
+        raise NotImplementedError
+
+    def chunk_bounds(self, chunk_size=BULK_BATCH_SIZE):
+        """Yield ``(after_roll_no, last_roll_no)`` ranges covering the table; see module_database.chunk_bounds."""
+        raise NotImplementedError
+
+    def fetch_range(self, after_roll_no, last_roll_no=MAX_ROLL_NO):
+        """Return the students with ``after_roll_no < roll_no <= last_roll_no`` in roll_no order.
+
+        A dob that is not a valid date is returned as stored, for the audit to report.
+        """
+        raise NotImplementedError
+
+    def find_duplicates(self, column):
+        """Yield ``(value, count, roll_nos)`` for each ``column`` value shared by several students."""
+        raise NotImplementedError
+
+    def config(self):
+        """Return the configure_backend options that open this same database, e.g. in another process."""
+        return {}
+
+    def change_version(self):
+        """Return the newest version in the students_changes log."""
+        raise NotImplementedError
+
+    def changes_since(self, version, limit=CHANGE_BATCH_SIZE):
+        """Return ``(version, roll_no, row)`` for each logged write after ``version``,
+        oldest first; ``row`` is the student as stored now, None if deleted."""
+        raise NotImplementedError
+
+    def oldest_change_version(self):
+        """Return the oldest version still in the students_changes log."""
+        raise NotImplementedError
+
+    def prune_changes(self, retention=CHANGE_RETENTION_SECONDS):
+        """Delete log entries older than ``retention`` seconds, except the newest; returns how many."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# Client errors for an unreachable or lost server (CR_CONNECTION_ERROR,
+# CR_CONN_HOST_ERROR, CR_SERVER_GONE_ERROR, CR_SERVER_LOST,
+# CR_SERVER_LOST_EXTENDED), plus lock wait timeouts and deadlocks.
+_MYSQL_TRANSIENT_ERRNOS = frozenset((2002, 2003, 2006, 2013, 2055, 1205, 1213))
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+
+    def setup(self):
+        module_database.setup_database()
+
+    def add(self, row):
+        return module_database.insert_student(row)
+
+    def update(self, row):
+        return module_database.update_student(row)
+
+    def delete(self, roll_no):
+        return module_database.delete_student(roll_no)
+
+    def add_many(self, rows, batch_size=BULK_BATCH_SIZE):
+        with metrics.timed("AddMany") as timer:
+            inserted = timer.rows = module_database.insert_students(rows, batch_size)[0]
+        return inserted
+
+    def apply_writes(self, writes):
+        outcomes = []
+        with metrics.timed("WriteBatch") as timer, module_database.get_pool().connection() as conn:
+            for action, row, expected in writes:
+                stored = module_database.run_statement(conn, "Lock", (row[1],))
+                outcome = write_outcome(action, row, expected, stored[0] if stored else None)
+                if outcome == "apply":
+                    module_database.run_statement(conn, action, module_database.statement_params(action, row))
+                outcomes.append("conflict" if outcome == "conflict" else "applied")
+            conn.commit()
+            timer.rows = len(writes)
+        for (action, row, _), outcome in zip(writes, outcomes):
+            if outcome == "applied":
+                module_database.query_cache.invalidate(row[1], None if action == "Delete" else tuple(row))
+        return outcomes
+
+    def is_transient(self, error):
+        # By errno, not class: the C extension raises connection failures
+        # as a plain DatabaseError where the pure-Python driver raises
+        # InterfaceError or OperationalError.
+        from mysql.connector import errors
+        if isinstance(error, (errors.PoolError, OSError)):
+            return True
+        return isinstance(error, errors.Error) and error.errno in _MYSQL_TRANSIENT_ERRNOS
+
+    def search(self, column, query, mode="prefix", limit=PAGE_SIZE):
+        return module_database.find_students(column, query, mode, limit)
+
+    def get_all(self):
+        return list(module_database.iter_students())
+
+    def fetch_page(self, after_roll_no=None, limit=PAGE_SIZE):
+        return module_database.fetch_page(after_roll_no, limit)
+
+    def fetch_listing(self, sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE):
+        return module_database.fetch_listing(sort_column, descending, after, filters, limit)
+
+    def chunk_bounds(self, chunk_size=BULK_BATCH_SIZE):
+        return module_database.chunk_bounds(chunk_size)
+
+    def fetch_range(self, after_roll_no, last_roll_no=MAX_ROLL_NO):
+        return module_database.fetch_range(after_roll_no, last_roll_no)
+
+    def find_duplicates(self, column):
+        return module_database.find_duplicates(column)
+
+    def change_version(self):
+        return module_database.change_version()
+
+    def changes_since(self, version, limit=CHANGE_BATCH_SIZE):
+        return module_database.fetch_changes(version, limit)
+
+    def oldest_change_version(self):
+        return module_database.oldest_change_version()
+
+    def prune_changes(self, retention=CHANGE_RETENTION_SECONDS):
+        return module_database.prune_changes(retention)
+
+    def close(self):
+        module_database.close_pool()
+
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+
+def _convert_audit_date(value):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return text  # written by something other than this program; module_audit reports it
+
+
+# Only the audit reads dates this leniently (via a "dob [AUDIT_DATE]" column
+# name): everywhere else a row needs a real date.
+sqlite3.register_converter("AUDIT_DATE", _convert_audit_date)
+
+_SQLITE_EMAIL_DOMAIN = "substr(email, instr(email, '@') + 1) COLLATE NOCASE"
+
+_SQLITE_SCHEMA = [
+    # Text columns compare case-insensitively, like MySQL's default collation,
+    # so equality, LIKE prefixes and ORDER BY can all use the indexes below.
+    '''CREATE TABLE IF NOT EXISTS students (
+                            name VARCHAR(100) COLLATE NOCASE,
+                            roll_no INTEGER PRIMARY KEY,
+                            email VARCHAR(100) COLLATE NOCASE,
+                            gender VARCHAR(10) COLLATE NOCASE,
+                            contact VARCHAR(20),
+                            dob DATE,
+                            address TEXT COLLATE NOCASE
+                        )''',
+    "CREATE INDEX IF NOT EXISTS idx_students_name ON students (name)",
+    "CREATE INDEX IF NOT EXISTS idx_students_email ON students (email)",
+    "CREATE INDEX IF NOT EXISTS idx_students_dob ON students (dob)",
+    "CREATE INDEX IF NOT EXISTS idx_students_gender ON students (gender)",
+    "CREATE INDEX IF NOT EXISTS idx_students_contact ON students (contact)",
+    f"CREATE INDEX IF NOT EXISTS idx_students_email_domain ON students ({_SQLITE_EMAIL_DOMAIN})",
+    # Trigram full-text index for substring searches on name and address,
+    # kept in step with the table by triggers
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+                            name, address, content='students', content_rowid='roll_no', tokenize='trigram')''',
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+                            INSERT INTO students_fts (rowid, name, address) VALUES (new.roll_no, new.name, new.address);
+                        END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+                            INSERT INTO students_fts (students_fts, rowid, name, address)
+                            VALUES ('delete', old.roll_no, old.name, old.address);
+                        END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+                            INSERT INTO students_fts (students_fts, rowid, name, address)
+                            VALUES ('delete', old.roll_no, old.name, old.address);
+                            INSERT INTO students_fts (rowid, name, address) VALUES (new.roll_no, new.name, new.address);
+                        END''',
+    # Change log for other clients to catch up from (see changes_since)
+    '''CREATE TABLE IF NOT EXISTS students_changes (
+                            version INTEGER PRIMARY KEY AUTOINCREMENT,
+                            roll_no INTEGER NOT NULL,
+                            changed_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+                        )''',
+    '''CREATE TRIGGER IF NOT EXISTS students_changes_insert AFTER INSERT ON students BEGIN
+                            INSERT INTO students_changes (roll_no) VALUES (new.roll_no);
+                        END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_changes_update AFTER UPDATE ON students BEGIN
+                            INSERT INTO students_changes (roll_no) VALUES (new.roll_no);
+                        END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_changes_delete AFTER DELETE ON students BEGIN
+                            INSERT INTO students_changes (roll_no) VALUES (old.roll_no);
+                        END''',
+]
+
+_COLUMN_LIST = ", ".join(STUDENT_COLUMNS)
+_SQLITE_INSERT = f"INSERT INTO students ({_COLUMN_LIST}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQLITE_UPDATE = ("UPDATE students SET name = ?, email = ?, gender = ?, contact = ?, dob = ?, address = ? "
+                  "WHERE roll_no = ?")
+_SQLITE_DELETE = "DELETE FROM students WHERE roll_no = ?"
+_SQLITE_SELECT = f"SELECT {_COLUMN_LIST} FROM students"
+_SELECT_BY_ROLL_NO = f"{_SQLITE_SELECT} WHERE roll_no = ?"
+_SQLITE_CHANGES = module_database.CHANGES_QUERY.replace("%s", "?")
+_SQLITE_PRUNE_CHANGES = ("DELETE FROM students_changes WHERE changed_at < strftime('%Y-%m-%d %H:%M:%f', 'now', ?) "
+                         "AND version < (SELECT MAX(version) FROM students_changes)")
+_SQLITE_CHUNK_END = module_database.CHUNK_END_QUERY.replace("%s", "?")
+_SQLITE_RANGE = module_database.RANGE_QUERY.replace("%s", "?").replace(" dob,", ' dob AS "dob [AUDIT_DATE]",', 1)
+
+
+class _ThreadConnection:
+    """Holds a thread's SQLite connection in a threading.local, so the
+    connection is closed when the thread ends and its locals are dropped."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+def _close_thread_connection(conn, connections, lock):
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    conn.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite storage in WAL mode.
+
+    Each thread gets its own connection (SQLite connections must not be
+    shared between threads), closed again when the thread ends, so a
+    server starting a thread per client does not pile up open files; WAL
+    lets those readers run alongside a writer.
+    All SQL is fixed text with ``?`` parameters, so sqlite3's per-connection
+    statement cache reuses the prepared statements.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.append(conn)
+            weakref.finalize(holder, _close_thread_connection, conn, self._connections, self._lock)
+        return holder.conn
+
+    def setup(self):
+        conn = self._connection()
+        with metrics.timed("Setup"), conn:
+            for statement in _SQLITE_SCHEMA:
+                conn.execute(statement)
+            analyzed = (conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+                        and conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'students'").fetchone())
+        if not analyzed:
+            self.analyze()
+
+    def analyze(self):
+        """Collect index statistics, so the planner knows e.g. that gender has
+        only a few values and a sorted listing should walk the sort column's
+        index instead. Run again after loading many rows."""
+        with metrics.timed("Analyze"), self._connection() as conn:
+            conn.execute("ANALYZE students")
+
+    def _write(self, action, sql, params):
+        with metrics.timed(action) as timer, self._connection() as conn:
+            count = timer.rows = conn.execute(sql, params).rowcount
+        return count
+
+    def add(self, row):
+        try:
+            return self._write("Add", _SQLITE_INSERT, tuple(row)) > 0
+        except sqlite3.IntegrityError:
+            return False
+
+    def update(self, row):
+        name, roll_no, email, gender, contact, dob, address = row
+        return self._write("Update", _SQLITE_UPDATE, (name, email, gender, contact, dob, address, roll_no)) > 0
+
+    def delete(self, roll_no):
+        return self._write("Delete", _SQLITE_DELETE, (roll_no,)) > 0
+
+    def add_many(self, rows, batch_size=BULK_BATCH_SIZE):
+        inserted = 0
+        rows = iter(rows)
+        with metrics.timed("AddMany") as timer:
+            while True:
+                batch = [tuple(row) for _, row in zip(range(batch_size), rows)]
+                if not batch:
+                    break
+                conn = self._connection()
+                try:
+                    with conn:
+                        conn.executemany(_SQLITE_INSERT, batch)
+                    inserted += len(batch)
+                except sqlite3.IntegrityError:
+                    # Some roll numbers are taken: insert the rest one by one
+                    with conn:
+                        for row in batch:
+                            try:
+                                conn.execute(_SQLITE_INSERT, row)
+                                inserted += 1
+                            except sqlite3.IntegrityError:
+                                pass
+            timer.rows = inserted
+        if inserted:
+            self._refresh_statistics(inserted)
+        return inserted
+
+    def _refresh_statistics(self, inserted):
+        """ANALYZE after adding a large share of the rows the statistics were
+        taken on; smaller loads run PRAGMA optimize, which only re-analyzes
+        when SQLite finds the statistics out of date."""
+        conn = self._connection()
+        stat = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = 'students' LIMIT 1").fetchone()
+        # The first number in a stat is the table's row count
+        if stat is None or inserted >= int(stat[0].split()[0]) * SQLITE_ANALYZE_GROWTH:
+            self.analyze()
+        else:
+            with metrics.timed("Optimize"), conn:
+                conn.execute("PRAGMA optimize")
+
+    def apply_writes(self, writes):
+        conn = self._connection()
+        outcomes = []
+        with metrics.timed("WriteBatch") as timer:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for action, row, expected in writes:
+                    current = conn.execute(_SELECT_BY_ROLL_NO, (row[1],)).fetchone()
+                    outcome = write_outcome(action, row, expected, current)
+                    if outcome == "apply":
+                        name, roll_no, email, gender, contact, dob, address = row
+                        if action == "Add":
+                            conn.execute(_SQLITE_INSERT, tuple(row))
+                        elif action == "Update":
+                            conn.execute(_SQLITE_UPDATE, (name, email, gender, contact, dob, address, roll_no))
+                        else:
+                            conn.execute(_SQLITE_DELETE, (roll_no,))
+                    outcomes.append("conflict" if outcome == "conflict" else "applied")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            timer.rows = len(writes)
+        return outcomes
+
+    def is_transient(self, error):
+        return isinstance(error, sqlite3.OperationalError)  # e.g. "database is locked"
+
+    def _query(self, sql, params=(), action=None):
+        if action is None:
+            return self._connection().execute(sql, params).fetchall()
+        with metrics.timed(action, sql) as timer:
+            rows = self._connection().execute(sql, params).fetchall()
+            timer.rows = len(rows)
+        return rows
+
+    def _search_query(self, column, query, mode, limit):
+        """Build the SQL for search as ``(sql, params)``."""
+        if column not in STUDENT_COLUMNS:
+            raise ValueError(f"Cannot search by {column!r}")
+        order = f" ORDER BY {column}, roll_no LIMIT ?"
+        like = f"{_SQLITE_SELECT} WHERE {column} LIKE ? ESCAPE '\\'{order}"
+        if mode == "substring" and column in ("name", "address"):
+            if len(query) >= SQLITE_TRIGRAM_SIZE:
+                phrase = '"' + query.replace('"', '""') + '"'
+                return (f"{_SQLITE_SELECT} WHERE roll_no IN "
+                        f"(SELECT rowid FROM students_fts WHERE students_fts MATCH ?){order}",
+                        (f"{column} : {phrase}", limit))
+            return like, ("%" + _escape_like(query) + "%", limit)
+        if mode == "substring":
+            mode = "prefix"
+        if mode == "exact":
+            return f"{_SQLITE_SELECT} WHERE {column} = ?{order}", (query, limit)
+        if mode == "prefix":
+            return like, (_escape_like(str(query)) + "%", limit)
+        if mode == "range":
+            start, end = query
+            return f"{_SQLITE_SELECT} WHERE {column} BETWEEN ? AND ?{order}", (start, end, limit)
+        raise ValueError(f"Unknown search mode {mode!r}")
+
+    def search(self, column, query, mode="prefix", limit=PAGE_SIZE):
+        return self._query(*self._search_query(column, query, mode, limit), action="Search")
+
+    def get_all(self):
+        return self._query(f"{_SQLITE_SELECT} ORDER BY roll_no", action="GetAll")
+
+    def fetch_page(self, after_roll_no=None, limit=PAGE_SIZE):
+        if after_roll_no is None:
+            return self._query(f"{_SQLITE_SELECT} ORDER BY roll_no LIMIT ?", (limit,), "GetAll")
+        return self._query(f"{_SQLITE_SELECT} WHERE roll_no > ? ORDER BY roll_no LIMIT ?", (after_roll_no, limit),
+                           "GetAll")
+
+    def fetch_listing(self, sort_column="roll_no", descending=False, after=None, filters=None, limit=PAGE_SIZE):
+        sql, params = module_database.build_listing_query(sort_column, descending, after, filters, limit,
+                                                          email_domain_sql=_SQLITE_EMAIL_DOMAIN)
+        return self._query(sql.replace("%s", "?"), params, "Listing")
+
+    def chunk_bounds(self, chunk_size=BULK_BATCH_SIZE):
+        after_roll_no = self._query(module_database.CHUNK_START_QUERY)[0][0]
+        while after_roll_no is not None:
+            row = self._query(_SQLITE_CHUNK_END, (after_roll_no, chunk_size - 1))
+            if not row:
+                yield after_roll_no, MAX_ROLL_NO
+                return
+            yield after_roll_no, row[0][0]
+            after_roll_no = row[0][0]
+
+    def fetch_range(self, after_roll_no, last_roll_no=MAX_ROLL_NO):
+        return self._query(_SQLITE_RANGE, (after_roll_no, last_roll_no), "GetRange")
+
+    def find_duplicates(self, column):
+        if column not in STUDENT_COLUMNS:
+            raise ValueError(f"Cannot group by {column!r}")
+        sql = (f"SELECT {column}, COUNT(*), group_concat(roll_no) FROM students WHERE {column} <> '' "
+               f"GROUP BY {column} HAVING COUNT(*) > 1")
+        with metrics.timed("Duplicates", column):
+            for value, count, roll_nos in self._connection().execute(sql):
+                yield value, count, sorted(int(roll_no) for roll_no in roll_nos.split(","))
+
+    def config(self):
+        return {"path": self.path}
+
+    def change_version(self):
+        return self._query("SELECT COALESCE(MAX(version), 0) FROM students_changes")[0][0]
+
+    def changes_since(self, version, limit=CHANGE_BATCH_SIZE):
+        return [(change_version, roll_no, tuple(row) if exists else None)
+                for change_version, roll_no, exists, *row in self._query(_SQLITE_CHANGES, (version, limit), "Changes")]
+
+    def oldest_change_version(self):
+        return self._query(module_database.OLDEST_CHANGE_QUERY)[0][0]
+
+    def prune_changes(self, retention=CHANGE_RETENTION_SECONDS):
+        return self._write("PruneChanges", _SQLITE_PRUNE_CHANGES, (f"-{retention} seconds",))
+
+    def explain(self, sql, params=()):
+        """Return SQLite's query plan details for ``sql``."""
+        return [row[-1] for row in self._query("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def _same_row(a, b):
+    # Compare as text: drivers differ in whether dob comes back as a date or a string
+    return [str(value) for value in a] == [str(value) for value in b]
+
+
+def write_outcome(action, row, expected, current):
+    """Decide what a queued write does given ``current``, the row now stored
+    under its roll_no (None if there is none).
+
+    Returns "apply"; "done" when the table already holds the write's result
+    (a journalled write replayed after it committed); or "conflict" when
+    the roll_no was taken by an add, or the row changed or vanished since
+    the update or delete was made against ``expected``.
+    """
+    if action == "Delete":
+        if current is None:
+            return "done"
+        return "conflict" if expected is not None and not _same_row(current, expected) else "apply"
+    if current is not None and _same_row(current, row):
+        return "done"
+    if action == "Add":
+        return "apply" if current is None else "conflict"
+    if current is None or (expected is not None and not _same_row(current, expected)):
+        return "conflict"
+    return "apply"
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def configure_backend(name, **options):
+    """Switch the storage engine used by module_service, e.g.
+    ``configure_backend("sqlite", path="students.db")``."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {name!r}; choose from {', '.join(BACKENDS)}")
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = BACKENDS[name](**options)
+    return _backend
+
+
+def get_backend():
+    """Return the configured backend; defaults to $STUDENTS_BACKEND, else MySQL."""
+    if _backend is None:
+        configure_backend(os.environ.get("STUDENTS_BACKEND", "mysql"))
+    return _backend
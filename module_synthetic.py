@@ -0,0 +1,61 @@
+"""Deterministic synthetic students for benchmarks and load tests.
+
+``generate_students(count, seed)`` always yields the same rows for the same
+arguments, and every row passes validate_student_record. Run
+``python module_synthetic.py 100000 students.csv`` to write a file that
+module_database.import_students can load into MySQL.
+"""
+import argparse
+import random
+from datetime import date
+
+from module_database import export_students
+
+FIRST_NAMES = (
+    ("Aarav", "Male"), ("Aisha", "Female"), ("Amelia", "Female"), ("Arjun", "Male"), ("Chen", "Male"),
+    ("Chloe", "Female"), ("Daniel", "Male"), ("Diya", "Female"), ("Elena", "Female"), ("Ethan", "Male"),
+    ("Fatima", "Female"), ("Gabriel", "Male"), ("Hana", "Female"), ("Ishaan", "Male"), ("Jack", "Male"),
+    ("Jose", "Male"), ("Kavya", "Female"), ("Liam", "Male"), ("Lucia", "Female"), ("Mei", "Female"),
+    ("Mohammed", "Male"), ("Noah", "Male"), ("Olivia", "Female"), ("Priya", "Female"), ("Rahul", "Male"),
+    ("Sara", "Female"), ("Sofia", "Female"), ("Tariq", "Male"), ("Vikram", "Male"), ("Zara", "Female"),
+)
+LAST_NAMES = (
+    "Ahmed", "Brown", "Chen", "Das", "Fernandez", "Garcia", "Gupta", "Ito", "Johnson", "Khan",
+    "Kim", "Kumar", "Lee", "Lopez", "Martin", "Mehta", "Nguyen", "Patel", "Reddy", "Rossi",
+    "Sato", "Shah", "Singh", "Smith", "Silva", "Taylor", "Wang", "Williams", "Wilson", "Zhang",
+)
+STREETS = ("Main Street", "Park Avenue", "Station Road", "High Street", "Lake View", "Mill Lane",
+           "Church Road", "Hill Crescent", "Temple Road", "Garden Colony")
+CITIES = ("Springfield", "Riverside", "Lakeside", "Greenville", "Fairview", "Madison", "Georgetown",
+          "Ashford", "Kingsbridge", "Newport")
+EMAIL_DOMAINS = ("gmail.com", "yahoo.com", "outlook.com")  # the domains validate_email accepts
+DOB_START = date(1995, 1, 1).toordinal()
+DOB_END = date(2008, 12, 31).toordinal()
+
+
+def generate_students(count, seed=0, start_roll_no=1):
+    """Yield ``count`` student rows in STUDENT_COLUMNS order, roll numbers counting up from ``start_roll_no``."""
+    rng = random.Random(seed)
+    for roll_no in range(start_roll_no, start_roll_no + count):
+        first, gender = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        email = f"{first}.{last}{roll_no}@{rng.choice(EMAIL_DOMAINS)}".lower()
+        contact = f"{rng.randrange(6, 10)}{rng.randrange(10**9):09d}"
+        dob = date.fromordinal(rng.randint(DOB_START, DOB_END))
+        address = f"{rng.randrange(1, 500)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        yield (f"{first} {last}", roll_no, email, gender, contact, dob, address)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic students to a CSV or JSONL file")
+    parser.add_argument("count", type=int)
+    parser.add_argument("path", help="output file; .jsonl/.json for JSON lines, anything else for CSV")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-roll-no", type=int, default=1)
+    args = parser.parse_args(argv)
+    written = export_students(args.path, students=generate_students(args.count, args.seed, args.start_roll_no))
+    print(f"Wrote {written} students to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_MS = 16  # ~60 fps while work is outstanding
+MAX_WORKERS = 4
+
+
+class BackgroundRunner:
+    """Run blocking database calls on worker threads and hand the results
+    back on the Tk thread.
+
+    Tk widgets may only be touched from the thread running ``mainloop``, so
+    finished calls are put on a queue that the Tk thread drains with
+    ``root.after`` while anything is in flight.
+
+    Calls submitted on the same ``channel`` supersede each other: a call
+    that has not started yet is cancelled, and the result of one that has
+    is dropped, so only the latest search or listing reaches the screen.
+
+    ``quiet`` calls, such as periodic polling, do not count towards
+    ``busy``, so they never flash the busy indicator.
+    """
+
+    def __init__(self, root, max_workers=MAX_WORKERS, on_busy_change=None):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="db-worker")
+        self._done = queue.SimpleQueue()
+        self._pending = 0
+        self._busy = 0
+        self._latest = {}
+        self._callbacks = {}
+        self._polling = False
+
+    @property
+    def busy(self):
+        return self._busy > 0
+
+    def submit(self, fn, *args, on_success=None, on_error=None, channel=None, quiet=False):
+        """Run ``fn(*args)`` in the background.
+
+        ``on_success(result)`` or ``on_error(exception)`` is later called on
+        the Tk thread, unless a newer call on the same ``channel`` replaced
+        this one first.
+        """
+        previous = self._latest.get(channel) if channel is not None else None
+        future = self._executor.submit(fn, *args)
+        self._callbacks[future] = (on_success, on_error, channel, quiet)
+        if channel is not None:
+            self._latest[channel] = future
+        self._pending += 1
+        if not quiet:
+            self._busy += 1
+            if self._busy == 1 and self.on_busy_change:
+                self.on_busy_change(True)
+        if previous is not None and previous.cancel():
+            self._finish(self._callbacks.pop(previous)[3])
+        future.add_done_callback(self._done.put)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        return future
+
+    def _finish(self, quiet):
+        self._pending -= 1
+        if quiet:
+            return
+        self._busy -= 1
+        if self._busy == 0 and self.on_busy_change:
+            self.on_busy_change(False)
+
+    def _poll(self):
+        while True:
+            try:
+                future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if future.cancelled():
+                continue
+            on_success, on_error, channel, quiet = self._callbacks.pop(future)
+            self._finish(quiet)
+            if channel is not None:
+                if self._latest.get(channel) is not future:
+                    continue
+                del self._latest[channel]
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_success:
+                        on_success(future.result())
+                elif on_error:
+                    on_error(error)
+            except Exception:
+                # Report it the way Tk reports a failing event handler, and
+                # keep polling so later results are still delivered.
+                self.root.report_callback_exception(*sys.exc_info())
+        if self._pending:
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,69 @@
+import bisect
+
+from module_records import StudentStore
+
+
+class StudentRows:
+    """Keeps a ttk.Treeview of students keyed by roll_no so single rows can
+    be patched in place instead of reloading the whole table.
+
+    Each row's Treeview item id is its roll_no, which makes lookups O(1) on
+    the Tk side. While the tree shows the roll_no-ordered listing, the
+    loaded roll numbers are also kept in a sorted list so a newly added
+    student can be inserted at its position with a binary search.
+
+    The typed values of every shown row are kept in a compact StudentStore,
+    so callers read a student back with ``get`` rather than parsing the
+    Treeview's string copies.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.students = StudentStore()
+        self.listed_roll_nos = []
+        self.ordered = True
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.students.clear()
+        self.listed_roll_nos = []
+
+    def get(self, roll_no):
+        """Return the shown Student with ``roll_no``, or None."""
+        return self.students.get(roll_no)
+
+    def replace(self, rows, ordered=True):
+        """Show ``rows``; ``ordered`` means they are the roll_no listing rather than search results."""
+        self.clear()
+        self.ordered = ordered
+        self.append(rows)
+
+    def append(self, rows):
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[1]), values=tuple(row))
+            self.students.append(row)
+        if self.ordered:
+            self.listed_roll_nos.extend(row[1] for row in rows)
+
+    def upsert(self, row, in_loaded_range=True):
+        """Update the row for ``row[1]`` in place, or insert it at its
+        roll_no position if it is new and falls inside the loaded range."""
+        iid = str(row[1])
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=tuple(row))
+            self.students.upsert(row)
+        elif self.ordered and in_loaded_range:
+            index = bisect.bisect_left(self.listed_roll_nos, row[1])
+            self.listed_roll_nos.insert(index, row[1])
+            self.tree.insert("", index, iid=iid, values=tuple(row))
+            self.students.append(row)
+
+    def remove(self, roll_no):
+        iid = str(roll_no)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+            self.students.remove(roll_no)
+        if self.ordered:
+            index = bisect.bisect_left(self.listed_roll_nos, roll_no)
+            if index < len(self.listed_roll_nos) and self.listed_roll_nos[index] == roll_no:
+                del self.listed_roll_nos[index]
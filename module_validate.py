@@ -1,3 +1,7 @@
+import re
+from itertools import compress
+from operator import not_
+
 def validate_email(email):
     if "@" in email and email.endswith(".com") or email.endswith(".edu"):
         local_part, domain_part = email.split("@", 1)
@@ -11,3 +15,94 @@ def validate_contact(no):
     else:
         return True
 
+
+# Batch validation for bulk imports and audits. These agree with
+# validate_email/validate_contact element by element, except that an address
+# with no "@" ending in ".edu" (which makes validate_email raise) is simply
+# reported as invalid with reason "missing_at".
+
+# validate_email's domain rule as one pattern: a gmail address with a
+# non-empty local part, or any yahoo/outlook address. Once an "@" is known
+# to be present, its suffix rule reduces to ending in ".com" or ".edu".
+_VALID_EMAIL_START = re.compile(r"[^@]+@gmail\.|[^@]*@(?:yahoo|outlook)\.")
+_VALID_EMAIL_SUFFIXES = (".com", ".edu")
+
+
+def _email_reason(email):
+    if "@" not in email:
+        return "missing_at"
+    if not (email.endswith(".com") or email.endswith(".edu")):
+        return "bad_suffix"
+    return "bad_domain"
+
+
+def _contact_reason(no):
+    return "too_short" if len(no) < 10 else "not_digits"
+
+
+def _reasons(mask, values, reason):
+    # Most rows are valid, so only visit the failures
+    reasons = [None] * len(values)
+    for i in compress(range(len(values)), map(not_, mask)):
+        reasons[i] = reason(values[i])
+    return reasons
+
+
+def _as_list(values):
+    if hasattr(values, "to_pylist"):  # pyarrow arrays
+        return values.to_pylist()
+    if hasattr(values, "tolist"):  # NumPy arrays: plain str is much faster to scan than np.str_
+        return values.tolist()
+    return list(values)
+
+
+def _numpy_strings(values):
+    """Return the numpy.strings ufuncs if ``values`` is a NumPy string array (NumPy 2+)."""
+    if type(values).__module__ != "numpy" or getattr(values, "dtype", None) is None or values.dtype.kind != "U":
+        return None
+    import numpy as np
+    return getattr(np, "strings", None)
+
+
+def validate_emails(emails):
+    """Validate a column of emails at once.
+
+    Accepts any iterable of strings, including NumPy and pyarrow string
+    arrays; NumPy arrays are checked with vectorized string ufuncs. Returns
+    ``(mask, reasons)``: a bool per email (a NumPy bool array for NumPy
+    input) and, for each invalid one, a reason code ("missing_at",
+    "bad_suffix", "bad_domain"); valid emails get None.
+    """
+    strings = _numpy_strings(emails)
+    if strings is not None:
+        import numpy as np
+        at = strings.find(emails, "@")
+        has_at = at >= 0
+        suffix_ok = strings.endswith(emails, ".com") | strings.endswith(emails, ".edu")
+        domain = at + 1
+        domain_ok = (((at > 0) & strings.startswith(emails, "gmail.", domain))
+                     | strings.startswith(emails, "yahoo.", domain) | strings.startswith(emails, "outlook.", domain))
+        mask = has_at & suffix_ok & domain_ok
+        reasons = np.where(mask, None, np.where(~has_at, "missing_at", np.where(~suffix_ok, "bad_suffix", "bad_domain")))
+        return mask, reasons.tolist()
+    values = _as_list(emails)
+    match = _VALID_EMAIL_START.match
+    mask = [email.endswith(_VALID_EMAIL_SUFFIXES) and match(email) is not None for email in values]
+    return mask, _reasons(mask, values, _email_reason)
+
+
+def validate_contacts(contacts):
+    """Validate a column of contact numbers at once, like validate_emails.
+
+    Reason codes are "too_short" and "not_digits".
+    """
+    strings = _numpy_strings(contacts)
+    if strings is not None:
+        import numpy as np
+        too_short = strings.str_len(contacts) < 10
+        mask = ~too_short & strings.isdigit(contacts)
+        reasons = np.where(mask, None, np.where(too_short, "too_short", "not_digits"))
+        return mask, reasons.tolist()
+    values = _as_list(contacts)
+    mask = [len(no) >= 10 and no.isdigit() for no in values]
+    return mask, _reasons(mask, values, _contact_reason)
@@ -0,0 +1,194 @@
+"""Write-behind queue for student adds, updates and deletes.
+
+Writes are appended to a local journal (one JSON object per line) and then
+applied by a background thread, up to ``batch_size`` at a time in a single
+transaction, so a burst of data entry costs one commit per batch instead of
+one per student. If the database cannot be reached the writes stay in the
+journal and are retried every ``retry_interval`` seconds; writes left in
+the journal when the program exits are replayed by the next ``start()``.
+
+Every write is checked against the row currently stored under its roll_no
+(module_storage.write_outcome): an add whose roll_no was taken meanwhile,
+or an update or delete of a row that changed since the user saw it, is not
+applied but reported as a conflict.
+
+Journal lines look like ``{"seq": 3, "action": "Update", "row": [...],
+"expected": [...]}``; once a batch commits, ``{"done": 3, "outcome":
+"applied"}`` lines mark its writes finished, and the journal is emptied
+whenever nothing is pending.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import date
+
+from module_storage import get_backend
+
+DEFAULT_JOURNAL_PATH = "pending_writes.jsonl"
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_DELAY = 0.005  # seconds to let concurrent writers join a batch
+RETRY_INTERVAL = 5.0       # seconds between attempts while the database is unreachable
+
+write_log = logging.getLogger("students.write_queue")
+
+
+def _decode_row(values):
+    if values is None:
+        return None
+    row = list(values)
+    if isinstance(row[5], str):
+        row[5] = date.fromisoformat(row[5])
+    return tuple(row)
+
+
+class WriteBehindQueue:
+    def __init__(self, journal_path=DEFAULT_JOURNAL_PATH, backend=None, batch_size=WRITE_BATCH_SIZE,
+                 batch_delay=WRITE_BATCH_DELAY, retry_interval=RETRY_INTERVAL):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.retry_interval = retry_interval
+        self.online = True
+        self.conflicts = []
+        self._backend = backend  # None: whatever module_storage.get_backend() returns
+        self._pending = deque()  # (seq, action, row, expected, future)
+        self._cond = threading.Condition()
+        self._next_seq = 1
+        self._journal = None
+        self._thread = None
+        self._closed = False
+        self._stopped = threading.Event()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def start(self):
+        """Queue the unfinished writes of a previous run, then start applying writes."""
+        for entry in self._read_journal():
+            self._pending.append((entry["seq"], entry["action"], _decode_row(entry["row"]),
+                                  _decode_row(entry["expected"]), Future()))
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        return self
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        entries = {}
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line torn by a crash mid-write
+                if "done" in entry:
+                    entries.pop(entry["done"], None)
+                else:
+                    entries[entry["seq"]] = entry
+                    self._next_seq = max(self._next_seq, entry["seq"] + 1)
+        return [entries[seq] for seq in sorted(entries)]
+
+    def submit(self, action, row, expected=None):
+        """Journal and queue a write; returns a Future resolving to "applied" or "conflict".
+
+        ``expected`` is the row as the user last saw it, for updates and
+        deletes; the write is a conflict if the stored row differs from it.
+        """
+        row = tuple(row)
+        expected = tuple(expected) if expected is not None else None
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            seq = self._next_seq
+            self._next_seq += 1
+            entry = {"seq": seq, "action": action, "row": row, "expected": expected}
+            self._journal.write(json.dumps(entry, default=str) + "\n")
+            self._journal.flush()
+            if not self.online:
+                self._sync_journal()
+            self._pending.append((seq, action, row, expected, future))
+            self._cond.notify()
+        return future
+
+    def _sync_journal(self):
+        # Writes that are applied promptly never need to survive a crash, so
+        # the journal only goes to disk once the database stops taking writes.
+        os.fsync(self._journal.fileno())
+
+    def flush(self, timeout=None):
+        """Wait until every queued write has been applied; returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed and (not self._pending or not self.online):
+                    return
+                deadline = time.monotonic() + self.batch_delay
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending[i] for i in range(min(self.batch_size, len(self._pending)))]
+            try:
+                outcomes = self._apply([(action, row, expected) for _, action, row, expected, _ in batch])
+            except Exception:
+                with self._cond:
+                    self.online = False
+                    self._sync_journal()
+                self._stopped.wait(self.retry_interval)
+                continue
+            self.online = True
+            self._finish(batch, outcomes)
+
+    def _apply(self, writes):
+        backend = self._backend or get_backend()
+        try:
+            return backend.apply_writes(writes)
+        except Exception as error:
+            if backend.is_transient(error):
+                raise
+            if len(writes) == 1:
+                return [error]
+        # Something in the batch was rejected: apply one at a time to find it
+        return [self._apply([write])[0] for write in writes]
+
+    def _finish(self, batch, outcomes):
+        with self._cond:
+            for (seq, action, row, expected, future), outcome in zip(batch, outcomes):
+                self._pending.popleft()
+                failed = isinstance(outcome, Exception)
+                self._journal.write(json.dumps({"done": seq, "outcome": "failed" if failed else outcome}) + "\n")
+                if failed:
+                    write_log.error("%s of roll_no %s failed: %s", action, row[1], outcome)
+                    future.set_exception(outcome)
+                    continue
+                if outcome == "conflict":
+                    self.conflicts.append((action, row, expected))
+                    write_log.warning("%s of roll_no %s not applied: it conflicts with the stored row", action, row[1])
+                future.set_result(outcome)
+            if not self._pending:
+                self._journal.truncate(0)
+            self._journal.flush()
+            self._cond.notify_all()
+
+    def close(self, timeout=None):
+        """Stop the worker once queued writes are applied (or the database is unreachable)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._journal is not None:
+            self._journal.close()
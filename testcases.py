@@ -1,13 +1,51 @@
+import asyncio
+import csv
+import http.client
+import json
+import os
+import sqlite3
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
-from module_database import setup_database, execute_stored_procedure
-from module_validate import validate_email, validate_contact
-from tkinter import Tk, StringVar, Text
-from module_gui import (add_student, update_student, delete_student, clear_fields )
+from contextlib import closing
+from datetime import date
+from unittest.mock import patch, MagicMock, AsyncMock
+from module_database import (setup_database, execute_stored_procedure, close_pool, ConnectionPool, fetch_page,
+                             import_students, export_students, build_search_query, explain_search, find_students)
+import module_database
+from module_validate import validate_email, validate_contact, validate_emails, validate_contacts
+from module_tasks import BackgroundRunner
+from module_live_search import LiveSearch
+from module_tree import StudentRows
+from module_records import Student, StudentStore
+from module_synthetic import generate_students
+from module_write_queue import WriteBehindQueue
+from module_change_feed import RELOAD, ChangeFeed
+from module_audit import audit_students, check_rows
+import module_service
+import module_storage
+from module_storage import configure_backend
+from module_metrics import Metrics, metrics
+from module_server import make_server
+import module_async_database
+from tkinter import Tk, StringVar, Text, TclError
+try:
+    # module_gui builds its window on import, which needs a display.
+    from module_gui import (add_student, update_student, delete_student, clear_fields )
+    GUI_UNAVAILABLE = None
+except TclError as exc:
+    GUI_UNAVAILABLE = "Tk cannot start: %s" % exc
 import mysql.connector
 
 
 class TestDatabaseModule(unittest.TestCase):
+    def setUp(self):
+        close_pool()
+        module_database.query_cache.clear()
+
+    def tearDown(self):
+        close_pool()
+
     @patch('mysql.connector.connect')
     def test_setup_database_success(self, mock_connect):
         """Test setup_database connects to the database and creates the table."""
@@ -15,7 +53,7 @@ class TestDatabaseModule(unittest.TestCase):
         mock_connect.return_value = mock_conn
         setup_database()
         mock_connect.assert_called_once()
-        mock_conn.cursor().execute.assert_called_with('''CREATE TABLE IF NOT EXISTS students (
+        mock_conn.cursor().execute.assert_any_call('''CREATE TABLE IF NOT EXISTS students (
                             name VARCHAR(100),
                             roll_no INT PRIMARY KEY,
                             email VARCHAR(100),
@@ -65,6 +103,1225 @@ class TestDatabaseModule(unittest.TestCase):
             "ManageStudents",
             ('GetAll', None, None, None, None, None, None, None, None, None) )
 
+    @patch('mysql.connector.connect')
+    def test_fetch_page_uses_keyset(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [("Ann", 5, "a@gmail.com", "Female", "1234567890", "2000-01-01", "x")]
+        rows = fetch_page(after_roll_no=4, limit=1)
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertIn("WHERE roll_no > %s ORDER BY roll_no LIMIT %s", query)
+        self.assertEqual(params, (4, 1))
+        self.assertEqual(rows[0][1], 5)
+
+    @patch('mysql.connector.connect')
+    def test_fetch_first_page(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+        fetch_page()
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertNotIn("WHERE", query)
+        self.assertEqual(params, (200,))
+
+
+def mysql_available():
+    try:
+        mysql.connector.connect(**module_database.DB_CONFIG).close()
+        return True
+    except Exception:
+        return False
+
+
+class TestIndexedSearch(unittest.TestCase):
+    def setUp(self):
+        close_pool()
+        module_database.query_cache.clear()
+
+    def tearDown(self):
+        close_pool()
+
+    @patch('mysql.connector.connect')
+    def test_migrations_run_once(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [(v,) for v, _ in module_database.SCHEMA_MIGRATIONS]
+        setup_database()
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertFalse(any(sql.startswith("CREATE INDEX") for sql in executed))
+
+    @patch('mysql.connector.connect')
+    def test_fulltext_indexes_built_without_stopwords(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+        setup_database()
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        first_fulltext = next(i for i, sql in enumerate(executed) if "FULLTEXT" in sql)
+        self.assertIn(module_database.DISABLE_FULLTEXT_STOPWORDS, executed[:first_fulltext])
+
+    def test_prefix_query_is_sargable(self):
+        sql, params = build_search_query("email", "ann_1", "prefix")
+        self.assertIn("WHERE email LIKE %s ORDER BY email, roll_no", sql)
+        self.assertEqual(params[0], "ann\\_1%")
+
+    def test_substring_uses_fulltext(self):
+        sql, params = build_search_query("name", "ohn", "substring")
+        self.assertIn("MATCH(name) AGAINST (%s IN BOOLEAN MODE)", sql)
+        self.assertEqual(params[0], '"ohn"')
+
+    def test_date_range(self):
+        sql, params = build_search_query("dob", ("2000-01-01", "2000-12-31"), "range")
+        self.assertIn("WHERE dob BETWEEN %s AND %s", sql)
+
+    def test_unknown_column_rejected(self):
+        with self.assertRaises(ValueError):
+            build_search_query("name; DROP TABLE students", "x")
+
+    @unittest.skipUnless(mysql_available(), "needs a local MySQL server")
+    def test_explain_uses_indexes(self):
+        setup_database()
+        cases = [
+            (("name", "Jo", "prefix"), "idx_students_name"),
+            (("email", "jo", "prefix"), "idx_students_email"),
+            (("dob", ("2000-01-01", "2000-12-31"), "range"), "idx_students_dob"),
+            (("name", "ohn", "substring"), "ft_students_name"),
+            (("address", "Main", "substring"), "ft_students_address"),
+        ]
+        for args, index in cases:
+            plan = explain_search(*args)[0]
+            self.assertIn(index, (plan["possible_keys"] or "").split(","), args)
+
+    @unittest.skipUnless(mysql_available(), "needs a local MySQL server")
+    def test_substring_search_finds_rows(self):
+        setup_database()
+        # Every bigram of "riya" and "ain" contains "i" or "a", both InnoDB default stopwords
+        row = ("Priya Nair", 999_999_001, "priya.nair@gmail.com", "Female", "9876543210", date(2001, 5, 4),
+               "12 Main Street")
+        module_database.insert_student(row)
+        try:
+            self.assertIn(row[1], [found[1] for found in find_students("name", "riya", "substring")])
+            self.assertIn(row[1], [found[1] for found in find_students("address", "Main", "substring")])
+        finally:
+            module_database.delete_student(row[1])
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        close_pool()
+        module_database.query_cache.clear()
+
+    def tearDown(self):
+        close_pool()
+
+    def row(self, roll_no, name="Ann"):
+        return (name, roll_no, "ann@gmail.com", "Female", "1234567890", "2000-01-01", "Street")
+
+    @patch('mysql.connector.connect')
+    def test_repeated_page_served_from_cache(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [self.row(1)]
+        hits = module_database.query_cache.hits
+        self.assertEqual(fetch_page(), fetch_page())
+        mock_cursor.execute.assert_called_once()
+        self.assertEqual(module_database.query_cache.hits, hits + 1)
+
+    @patch('mysql.connector.connect')
+    def test_delete_invalidates_only_entries_with_roll_no(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [self.row(1)]
+        find_students("name", "Ann")
+        mock_cursor.fetchall.return_value = [self.row(2, "Bob")]
+        find_students("name", "Bob")
+        execute_stored_procedure("ManageStudents", ('Delete', None, 1, None, None, None, None, None, None, None))
+        self.assertIsNone(module_database.query_cache.get(("Search", "name", "Ann", "prefix", 200)))
+        self.assertIsNotNone(module_database.query_cache.get(("Search", "name", "Bob", "prefix", 200)))
+
+    @patch('mysql.connector.connect')
+    def test_add_invalidates_matching_searches(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [self.row(1)]
+        find_students("name", "an")
+        find_students("name", "Bo")
+        execute_stored_procedure("ManageStudents", ('Add',) + self.row(5, "Anna") + (None, None))
+        self.assertIsNone(module_database.query_cache.get(("Search", "name", "an", "prefix", 200)))
+        self.assertIsNotNone(module_database.query_cache.get(("Search", "name", "Bo", "prefix", 200)))
+
+    def test_lru_eviction_bounded_by_bytes(self):
+        cache = module_database.QueryCache(max_bytes=2000)
+        for i in range(20):
+            cache.put(("GetPage", i, 1), [self.row(i)])
+        self.assertLessEqual(cache.size, 2000)
+        self.assertGreater(cache.evictions, 0)
+        self.assertIsNotNone(cache.get(("GetPage", 19, 1)))
+        self.assertIsNone(cache.get(("GetPage", 0, 1)))
+
+    def test_stale_read_not_cached_after_write(self):
+        cache = module_database.QueryCache()
+        generation = cache.generation
+        cache.invalidate(1)
+        cache.put(("GetPage", None, 1), [self.row(1)], generation=generation)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        close_pool()
+
+    def tearDown(self):
+        close_pool()
+
+    @patch('mysql.connector.connect')
+    def test_connection_reused_across_calls(self, mock_connect):
+        mock_connect.return_value = MagicMock()
+        args = ('GetAll', None, None, None, None, None, None, None, None, None)
+        execute_stored_procedure("ManageStudents", args)
+        execute_stored_procedure("ManageStudents", args)
+        setup_database()
+        mock_connect.assert_called_once()
+
+    @patch('mysql.connector.connect')
+    def test_cursor_closed_after_call(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        execute_stored_procedure("ManageStudents",
+            ('GetAll', None, None, None, None, None, None, None, None, None))
+        mock_conn.cursor.return_value.close.assert_called_once()
+
+    def test_connection_returned_to_pool(self):
+        mock_conn = MagicMock()
+        pool = ConnectionPool(size=1, connect=lambda **config: mock_conn)
+        with pool.connection() as conn:
+            self.assertIs(conn, mock_conn)
+        with pool.connection() as conn:
+            self.assertIs(conn, mock_conn)
+
+    def test_unhealthy_connection_replaced(self):
+        stale, fresh = MagicMock(), MagicMock()
+        stale.is_connected.return_value = False
+        connections = iter([stale, fresh])
+        pool = ConnectionPool(size=1, health_check_interval=0, connect=lambda **config: next(connections))
+        with pool.connection():
+            pass
+        with pool.connection() as conn:
+            self.assertIs(conn, fresh)
+        stale.close.assert_called_once()
+
+    def test_reused_connection_sees_other_commits(self):
+        path = os.path.join(tempfile.mkdtemp(), "pool.db")
+        with closing(sqlite3.connect(path)) as writer:
+            writer.execute("PRAGMA journal_mode=WAL")
+            writer.execute("CREATE TABLE t (x INTEGER)")
+            writer.commit()
+
+            def connect(**config):
+                # Like mysql-connector with autocommit off: reads open a transaction
+                conn = sqlite3.connect(path, isolation_level=None)
+                conn.execute("BEGIN")
+                return conn
+            pool = ConnectionPool(size=1, connect=connect)
+            with pool.connection() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone(), (0,))
+            writer.execute("INSERT INTO t VALUES (1)")
+            writer.commit()
+            with pool.connection() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone(), (1,))
+            pool.close()
+
+    def test_pool_exhausted(self):
+        pool = ConnectionPool(size=1, timeout=0.01, connect=lambda **config: MagicMock())
+        with pool.connection():
+            with self.assertRaises(mysql.connector.errors.PoolError):
+                pool.acquire()
+
+
+class TestBulkImportExport(unittest.TestCase):
+    def setUp(self):
+        close_pool()
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        close_pool()
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    @patch('mysql.connector.connect')
+    def test_import_csv_batches_and_reports_errors(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        path = self.write("students.csv",
+            "name,roll_no,email,gender,contact,dob,address\n"
+            "Ann,1,ann@gmail.com,Female,1234567890,2000-01-01,Street 1\n"
+            "Bob,x,bob@gmail.com,Male,1234567890,2000-01-01,Street 2\n"
+            "Cat,3,cat@gmail.com,Female,123,2000-01-01,Street 3\n"
+            "Dan,4,dan@yahoo.com,Male,1234567890,2000-01-01,Street 4\n")
+        inserted, errors = import_students(path, batch_size=1)
+        self.assertEqual(inserted, 2)
+        self.assertEqual(errors, [(3, "Roll No must be an integer"), (4, "Contact No must be at least 10 digits")])
+        self.assertEqual(mock_cursor.executemany.call_count, 2)
+
+    @patch('mysql.connector.connect')
+    def test_import_falls_back_to_single_rows(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.executemany.side_effect = mysql.connector.Error("Duplicate entry")
+        mock_cursor.execute.side_effect = [None, mysql.connector.Error("Duplicate entry '1'")]
+        path = self.write("students.jsonl",
+            '{"name": "Ann", "roll_no": 2, "email": "ann@gmail.com", "gender": "Female", '
+            '"contact": "1234567890", "dob": "2000-01-01", "address": "Street 1"}\n'
+            '{"name": "Bob", "roll_no": 1, "email": "bob@gmail.com", "gender": "Male", '
+            '"contact": "1234567890", "dob": "2000-01-01", "address": "Street 2"}\n')
+        inserted, errors = import_students(path)
+        self.assertEqual(inserted, 1)
+        self.assertEqual(errors, [(2, "Duplicate entry '1'")])
+
+    @patch('module_database.fetch_page')
+    def test_export_streams_pages(self, mock_fetch_page):
+        mock_fetch_page.side_effect = [
+            [("Ann", 1, "ann@gmail.com", "Female", "1234567890", "2000-01-01", "Street 1")],
+            [],
+        ]
+        path = os.path.join(self.dir, "out.csv")
+        self.assertEqual(export_students(path, batch_size=1), 1)
+        mock_fetch_page.assert_called_with(1, 1, use_cache=False)
+        with open(path) as f:
+            self.assertEqual(f.read().splitlines()[1], "Ann,1,ann@gmail.com,Female,1234567890,2000-01-01,Street 1")
+
+
+class FakeRoot:
+    """Stands in for Tk: collects after() callbacks so tests can pump them."""
+    def __init__(self):
+        self.callbacks = []
+        self.errors = []
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.errors.append(exc)
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+        return callback
+
+    def after_cancel(self, after_id):
+        self.callbacks.remove(after_id)
+
+    def pump(self, runner):
+        while self.callbacks:
+            runner._executor.submit(lambda: None).result()
+            self.callbacks.pop(0)()
+
+
+class TestBackgroundRunner(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.busy = []
+        self.runner = BackgroundRunner(self.root, max_workers=1, on_busy_change=self.busy.append)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_failing_callback_does_not_stop_polling(self):
+        results = []
+        self.runner.submit(lambda: 1, on_success=lambda result: 1 / 0)
+        self.runner.submit(lambda: 2, on_success=results.append)
+        self.root.pump(self.runner)
+        self.assertIsInstance(self.root.errors[0], ZeroDivisionError)
+        self.assertEqual(results, [2])
+        self.runner.submit(lambda: 3, on_success=results.append)
+        self.root.pump(self.runner)
+        self.assertEqual(results, [2, 3])
+
+    def test_result_delivered_on_poll(self):
+        results = []
+        self.runner.submit(lambda x: x * 2, 21, on_success=results.append)
+        self.root.pump(self.runner)
+        self.assertEqual(results, [42])
+        self.assertEqual(self.busy, [True, False])
+
+    def test_error_delivered(self):
+        errors = []
+        self.runner.submit(lambda: 1 / 0, on_error=errors.append)
+        self.root.pump(self.runner)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_newer_call_supersedes_older(self):
+        results = []
+        self.runner.submit(lambda: "old", on_success=results.append, channel="search")
+        self.runner.submit(lambda: "new", on_success=results.append, channel="search")
+        self.root.pump(self.runner)
+        self.assertEqual(results, ["new"])
+        self.assertFalse(self.runner.busy)
+
+    def test_quiet_calls_leave_busy_alone(self):
+        results = []
+        self.runner.submit(lambda: "polled", on_success=results.append, quiet=True)
+        self.assertFalse(self.runner.busy)
+        self.root.pump(self.runner)
+        self.assertEqual(results, ["polled"])
+        self.assertEqual(self.busy, [])
+
+
+class FakeTree:
+    """Minimal in-memory stand-in for the ttk.Treeview calls StudentRows makes."""
+    def __init__(self):
+        self.items = {}
+        self.order = []
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.items[iid]
+            self.order.remove(iid)
+
+    def insert(self, parent, index, iid, values):
+        self.items[iid] = values
+        self.order.insert(len(self.order) if index == "end" else index, iid)
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def item(self, iid, values):
+        self.items[iid] = values
+
+
+def student_row(name, roll_no, dob=date(2000, 1, 1)):
+    return (name, roll_no, f"s{roll_no}@gmail.com", "Female", "1234567890", dob, "Street 1")
+
+
+class TestStudentRows(unittest.TestCase):
+    def setUp(self):
+        self.tree = FakeTree()
+        self.rows = StudentRows(self.tree)
+        self.rows.replace([student_row("A", 1), student_row("C", 3)])
+
+    def test_add_inserted_in_roll_no_order(self):
+        self.rows.upsert(student_row("B", 2))
+        self.assertEqual(self.tree.order, ["1", "2", "3"])
+
+    def test_update_patches_in_place(self):
+        self.rows.upsert(student_row("C2", 3))
+        self.assertEqual(self.tree.items["3"], student_row("C2", 3))
+        self.assertEqual(self.tree.order, ["1", "3"])
+        self.assertEqual(self.rows.get(3).name, "C2")
+
+    def test_delete_removes_only_that_row(self):
+        self.rows.remove(1)
+        self.rows.upsert(student_row("B", 2))
+        self.assertEqual(self.tree.order, ["2", "3"])
+        self.assertIsNone(self.rows.get(1))
+
+    def test_add_outside_loaded_range_skipped(self):
+        self.rows.upsert(student_row("Z", 99), in_loaded_range=False)
+        self.assertEqual(self.tree.order, ["1", "3"])
+
+    def test_search_results_not_extended_by_adds(self):
+        self.rows.replace([student_row("C", 3)], ordered=False)
+        self.rows.upsert(student_row("B", 2))
+        self.assertEqual(self.tree.order, ["3"])
+        self.assertEqual(len(self.rows.students), 1)
+
+
+class TestStudentRecords(unittest.TestCase):
+    def test_student_behaves_like_a_row(self):
+        student = Student.from_row(student_row("Ann", 1))
+        self.assertFalse(hasattr(student, "__dict__"))
+        self.assertEqual(student, student_row("Ann", 1))
+        self.assertEqual((student[0], student[1], student[5]), ("Ann", 1, date(2000, 1, 1)))
+        self.assertEqual(dict(zip(module_database.STUDENT_COLUMNS, student))["email"], "s1@gmail.com")
+
+    def test_genders_are_shared(self):
+        male = "".join(["Ma", "le"])
+        self.assertIs(Student("A", 1, "", male, "", None, "").gender, Student("B", 2, "", "Male", "", None, "").gender)
+
+    def test_store_round_trips_rows(self):
+        rows = [student_row("A", 5), student_row("B", 2, dob="1999-12-31"), student_row("C", 9, dob=None)]
+        store = StudentStore(rows)
+        self.assertEqual([student.roll_no for student in store], [5, 2, 9])
+        self.assertEqual(store.get(2).dob, date(1999, 12, 31))
+        self.assertIsNone(store.get(9).dob)
+        self.assertEqual(list(store)[0], rows[0])
+
+    def test_store_remove_keeps_order_and_index(self):
+        store = StudentStore(student_row(str(roll_no), roll_no) for roll_no in range(1, 7))
+        self.assertTrue(store.remove(2))
+        self.assertFalse(store.remove(2))
+        store.upsert(student_row("Z", 2))
+        self.assertEqual([student.roll_no for student in store], [1, 3, 4, 5, 6, 2])
+        for roll_no in (1, 3, 4, 5):  # compacts once most slots are free
+            store.remove(roll_no)
+        self.assertEqual(len(store), 2)
+        self.assertEqual([student.name for student in store], ["6", "Z"])
+        self.assertEqual(store.get(6).roll_no, 6)
+        self.assertNotIn(5, store)
+
+    def test_store_keyed_by_roll_no(self):
+        store = StudentStore([student_row("A", 1), student_row("B", 2), student_row("C", 3)])
+        store.upsert(student_row("B2", 2))
+        store.upsert(student_row("D", 4))
+        self.assertTrue(store.remove(1))
+        self.assertFalse(store.remove(1))
+        self.assertNotIn(1, store)
+        self.assertEqual([student.name for student in store], ["B2", "C", "D"])
+        self.assertEqual(store.get(3).name, "C")
+
+    def test_export_from_store(self):
+        path = os.path.join(tempfile.mkdtemp(), "students.jsonl")
+        store = StudentStore([student_row("A", 1), student_row("B", 2)])
+        self.assertEqual(export_students(path, students=store), 2)
+        with open(path) as f:
+            self.assertEqual(json.loads(f.readline())["dob"], "2000-01-01")
+
+
+def sample_record(**changes):
+    record = {"name": "Ann", "roll_no": "1", "email": "ann@gmail.com", "gender": "Female",
+              "contact": "1234567890", "dob": "2000-01-01", "address": "Street 1"}
+    record.update(changes)
+    return record
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Runs against a real, throwaway SQLite database."""
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.backend = configure_backend("sqlite", path=os.path.join(self.dir, "students.db"))
+        module_service.setup_storage()
+
+    def tearDown(self):
+        module_storage._backend.close()
+        module_storage._backend = None
+
+
+class TestServiceLayer(SQLiteTestCase):
+    def test_add_then_search(self):
+        self.assertTrue(module_service.add_student(sample_record()))
+        rows = module_service.search_students("name", "an")
+        self.assertEqual([row[1] for row in rows], [1])
+
+    def test_duplicate_roll_no_rejected(self):
+        self.assertTrue(module_service.add_student(sample_record()))
+        self.assertFalse(module_service.add_student(sample_record(name="Bob")))
+
+    def test_invalid_record_never_reaches_database(self):
+        with self.assertRaises(module_service.ValidationError) as context:
+            module_service.add_student(sample_record(email="ann@example.org"))
+        self.assertEqual(str(context.exception), "Invalid email format")
+        self.assertEqual(self.backend.get_all(), [])
+
+    def test_update_and_delete(self):
+        module_service.add_student(sample_record())
+        self.assertTrue(module_service.update_student(sample_record(name="Annie")))
+        self.assertEqual(module_service.list_students()[0][0], "Annie")
+        self.assertTrue(module_service.delete_student("1"))
+        self.assertFalse(module_service.delete_student("1"))
+
+    def test_delete_requires_roll_no(self):
+        with self.assertRaises(module_service.ValidationError):
+            module_service.delete_student("")
+
+    def test_prepare_search(self):
+        self.assertEqual(module_service.prepare_search("name", "Jo"), ("name", "Jo", "substring"))
+        self.assertEqual(module_service.prepare_search("dob", "2000-01-01 to 2000-12-31"),
+                         ("dob", ("2000-01-01", "2000-12-31"), "range"))
+        with self.assertRaises(module_service.ValidationError):
+            module_service.prepare_search("address; --", "x")
+        with self.assertRaises(module_service.ValidationError):
+            module_service.prepare_search("name", "")
+
+
+class TestSQLiteBackend(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for roll_no, name, dob, address in [(1, "John Smith", "2000-01-02", "12 Main Street"),
+                                            (2, "Jane Doe", "2001-05-06", "4 High Road"),
+                                            (3, "Johanna Lee", "2002-09-10", "7 Mill Lane")]:
+            self.backend.add((name, roll_no, f"s{roll_no}@gmail.com", "Female", "1234567890", dob, address))
+
+    def roll_nos(self, rows):
+        return [row[1] for row in rows]
+
+    def test_search_modes(self):
+        self.assertEqual(self.roll_nos(self.backend.search("name", "joh", "prefix")), [3, 1])
+        self.assertEqual(self.roll_nos(self.backend.search("name", "SMIT", "substring")), [1])
+        self.assertEqual(self.roll_nos(self.backend.search("address", "high", "substring")), [2])
+        self.assertEqual(self.roll_nos(self.backend.search("roll_no", "2", "exact")), [2])
+        self.assertEqual(self.roll_nos(self.backend.search("dob", ("2001-01-01", "2002-12-31"), "range")), [2, 3])
+
+    def test_fulltext_index_follows_updates(self):
+        self.backend.update(("Jane Doe", 2, "s2@gmail.com", "Female", "1234567890", "2001-05-06", "9 Park Avenue"))
+        self.assertEqual(self.backend.search("address", "high", "substring"), [])
+        self.assertEqual(self.roll_nos(self.backend.search("address", "park", "substring")), [2])
+
+    def test_keyset_pages(self):
+        self.assertEqual(self.roll_nos(self.backend.fetch_page(None, 2)), [1, 2])
+        self.assertEqual(self.roll_nos(self.backend.fetch_page(2, 2)), [3])
+
+    def test_dob_round_trips_as_date(self):
+        self.assertEqual(str(self.backend.get_all()[0][5]), "2000-01-02")
+
+    def test_queries_use_indexes(self):
+        select = "SELECT * FROM students"
+        plan = self.backend.explain(f"{select} WHERE name LIKE ? ESCAPE '\\' ORDER BY name, roll_no", ("jo%",))
+        self.assertIn("USING INDEX idx_students_name", plan[0])
+        plan = self.backend.explain(f"{select} WHERE dob BETWEEN ? AND ?", ("2000-01-01", "2001-01-01"))
+        self.assertIn("USING INDEX idx_students_dob", plan[0])
+
+    def test_wal_mode(self):
+        mode = self.backend._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_only_large_loads_rerun_analyze(self):
+        with patch.object(self.backend, "analyze", wraps=self.backend.analyze) as analyze:
+            self.backend.add_many(generate_students(100, start_roll_no=10))
+            self.assertEqual(analyze.call_count, 1)
+            self.backend.add_many(generate_students(5, start_roll_no=1000))
+            self.assertEqual(analyze.call_count, 1)
+            self.backend.add_many(generate_students(20, start_roll_no=2000))
+            self.assertEqual(analyze.call_count, 2)
+
+
+class FlakyBackend(module_storage.SQLiteBackend):
+    """SQLite backend whose writes fail as if the server were unreachable while ``down``."""
+    down = False
+
+    def apply_writes(self, writes):
+        if self.down:
+            raise module_storage.sqlite3.OperationalError("unable to open database file")
+        return super().apply_writes(writes)
+
+
+class TestWriteBehindQueue(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journal = os.path.join(self.dir, "pending.jsonl")
+        self.queues = []
+
+    def tearDown(self):
+        module_service.close_write_queue()
+        for queue in self.queues:
+            queue.close(1)
+        super().tearDown()
+
+    def make_queue(self, backend=None):
+        queue = WriteBehindQueue(self.journal, backend=backend, batch_delay=0.05, retry_interval=0.05)
+        self.queues.append(queue)
+        return queue.start()
+
+    def test_writes_are_batched(self):
+        queue = self.make_queue()
+        with patch.object(self.backend, "apply_writes", wraps=self.backend.apply_writes) as apply_writes:
+            futures = [queue.submit("Add", row) for row in generate_students(30)]
+            self.assertTrue(queue.flush(5))
+        self.assertEqual([future.result() for future in futures], ["applied"] * 30)
+        self.assertLess(apply_writes.call_count, 30)
+        self.assertEqual(len(self.backend.get_all()), 30)
+        self.assertEqual(os.path.getsize(self.journal), 0)
+
+    def test_conflicts(self):
+        first, second = generate_students(2)
+        self.backend.add(first)
+        stale = first
+        self.backend.update(first[:4] + ("9999999999",) + first[5:])
+        queue = self.make_queue()
+        taken = queue.submit("Add", (second[0], first[1]) + second[2:])
+        stale_update = queue.submit("Update", first[:2] + ("new@gmail.com",) + first[3:], stale)
+        fresh = queue.submit("Add", second)
+        self.assertEqual([future.result(5) for future in (taken, stale_update, fresh)],
+                         ["conflict", "conflict", "applied"])
+        self.assertEqual(len(queue.conflicts), 2)
+        self.assertEqual(self.backend.get_all()[0][4], "9999999999")
+
+    def test_offline_writes_replay_after_restart(self):
+        backend = FlakyBackend(os.path.join(self.dir, "students.db"))
+        backend.down = True
+        queue = self.make_queue(backend)
+        rows = list(generate_students(3))
+        for row in rows:
+            queue.submit("Add", row)
+        queue.submit("Delete", (None, 2, None, None, None, None, None), rows[1])
+        self.assertFalse(queue.flush(0.2))
+        self.assertFalse(queue.online)
+        queue.close(1)
+        backend.close()
+
+        replay = self.make_queue()
+        self.assertTrue(replay.flush(5))
+        self.assertEqual([row[1] for row in self.backend.get_all()], [1, 3])
+        # Replaying the same writes again changes nothing and reports no conflicts
+        with open(self.journal, "w") as f:
+            for seq, row in enumerate(rows, 1):
+                f.write(json.dumps({"seq": seq, "action": "Add", "row": row, "expected": None}, default=str) + "\n")
+        again = self.make_queue()
+        self.assertTrue(again.flush(5))
+        self.assertEqual(len(self.backend.get_all()), 3)
+        self.assertEqual(again.conflicts, [])
+
+    def test_service_reports_queued_writes(self):
+        backend = FlakyBackend(os.path.join(self.dir, "students.db"))
+        backend.down = True
+        queue = module_service.configure_write_queue(self.journal, backend=backend, retry_interval=0.05)
+        with patch.object(module_service, "WRITE_WAIT", 0.1):
+            self.assertEqual(module_service.add_student(sample_record()), module_service.QUEUED)
+            backend.down = False
+            self.assertTrue(queue.flush(5))
+            self.assertTrue(module_service.update_student(sample_record(name="Annie"), expected=None))
+        self.assertEqual(self.backend.get_all()[0][0], "Annie")
+        backend.close()
+
+
+class TestSortedListing(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rows = list(generate_students(300))
+        self.backend.add_many(self.rows)
+
+    def browse_all(self, sort_column, descending=False, filters=None, limit=40):
+        rows, after = [], None
+        while True:
+            page = module_service.browse_students(sort_column, descending, after, filters, limit)
+            rows.extend(page)
+            if len(page) < limit:
+                return rows
+            after = module_database.listing_key(page[-1], sort_column)
+
+    def test_keyset_pages_follow_sort_order(self):
+        for column in ("name", "dob", "email", "roll_no"):
+            index = module_database.STUDENT_COLUMNS.index(column)
+            for descending in (False, True):
+                expected = sorted(self.rows, key=lambda row: (row[index].lower() if index in (0, 2) else row[index],
+                                                              row[1]), reverse=descending)
+                self.assertEqual([row[1] for row in self.browse_all(column, descending)],
+                                 [row[1] for row in expected], (column, descending))
+
+    def test_null_sort_values_are_paged_past(self):
+        with self.backend._connection() as conn:
+            # Rows written without the form, e.g. by an old import
+            conn.executemany("INSERT INTO students (roll_no, name, dob) VALUES (?, ?, NULL)",
+                             [(roll_no, None) for roll_no in range(1001, 1005)])
+        for column in ("name", "dob"):
+            index = module_database.STUDENT_COLUMNS.index(column)
+            for descending in (False, True):
+                rows = self.browse_all(column, descending, limit=3)
+                self.assertEqual(len(rows), 304, (column, descending))
+                nulls = [row[1] for row in rows if row[index] is None]
+                expected = [1001, 1002, 1003, 1004]
+                if descending:
+                    self.assertEqual(nulls, expected[::-1])
+                    self.assertEqual([row[1] for row in rows[-4:]], expected[::-1])
+                else:
+                    self.assertEqual([row[1] for row in rows[:4]], expected)
+
+    def test_filters_are_combined(self):
+        filters = {"gender": "female", "dob": ("2000-01-01", ""), "email_domain": "@GMAIL.com"}
+        expected = [row[1] for row in self.rows if row[3] == "Female" and str(row[5]) >= "2000-01-01"
+                    and row[2].endswith("@gmail.com")]
+        self.assertTrue(expected)
+        self.assertEqual([row[1] for row in self.browse_all("roll_no", filters=filters)], expected)
+        self.assertEqual(sorted(row[1] for row in self.browse_all("name", True, filters)), expected)
+
+    def test_invalid_requests(self):
+        with self.assertRaises(module_service.ValidationError):
+            module_service.browse_students("address")
+        with self.assertRaises(module_service.ValidationError):
+            module_service.browse_students(filters={"dob": ("yesterday", None)})
+        with self.assertRaises(module_service.ValidationError):
+            module_service.browse_students(filters={"city": "Newport"})
+
+    def test_queries_use_indexes(self):
+        def plan(*args):
+            sql, params = module_database.build_listing_query(*args, email_domain_sql=module_storage._SQLITE_EMAIL_DOMAIN)
+            return " ".join(self.backend.explain(sql.replace("%s", "?"), params))
+        self.assertIn("idx_students_name (name>?)", plan("name", False, ("Jack Lee", 5)))
+        self.assertNotIn("TEMP B-TREE", plan("dob", True, ("2000-01-01", 5), {"gender": "Male"}))
+        self.assertIn("idx_students_email_domain", plan("roll_no", False, None, {"email_domain": "yahoo.com"}))
+
+    def test_mysql_query(self):
+        sql, params = module_database.build_listing_query("dob", True, ("2000-01-01", 7), {"gender": "Male"}, 20)
+        self.assertTrue(sql.endswith("WHERE gender = %s AND ((dob, roll_no) < (%s, %s) OR dob IS NULL) "
+                                     "ORDER BY dob DESC, roll_no DESC LIMIT %s"))
+        self.assertEqual(params, ("Male", "2000-01-01", 7, 20))
+        sql, params = module_database.build_listing_query("name", False, (None, 7), None, 20)
+        self.assertIn("WHERE (name IS NULL AND roll_no > %s OR name IS NOT NULL) ORDER BY name", sql)
+        self.assertEqual(params, (7, 20))
+
+
+class TestAudit(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend.add_many(generate_students(40))
+        with self.backend._connection() as conn:
+            # Rows that never went through validation, as from an old import or direct SQL
+            conn.executemany("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                ("Bad Email", 100, "bad.example.com", "Male", "1234567890", "2000-01-01", "x"),
+                ("Short Contact", 101, "short@gmail.com", "Male", "12345", "2000-01-01", "x"),
+                ("Future", 102, "future@gmail.com", "Male", "1234567891", "2999-01-01", "x"),
+                ("Not A Date", 103, "notadate@gmail.com", "Male", "1234567892", "2000-02-30", "x"),
+                ("Copy", 104, "COPY@gmail.com", "Male", "1234567893", "2000-01-01", "x"),
+                ("Copy", 105, "copy@gmail.com", "Male", "1234567893", "2000-01-01", "x"),
+            ])
+        self.report = os.path.join(self.dir, "audit.csv")
+
+    def test_report(self):
+        summary = audit_students(self.report, workers=2, chunk_size=7, today=date(2026, 1, 1))
+        self.assertEqual(summary["rows"], 46)
+        self.assertEqual(summary["email:missing_at"], 1)
+        self.assertEqual(summary["contact:too_short"], 1)
+        self.assertEqual(summary["dob:in_future"], 1)
+        self.assertEqual(summary["dob:not_a_date"], 1)
+        self.assertEqual(summary["email:duplicate"], 2)
+        self.assertEqual(summary["contact:duplicate"], 2)
+        with open(self.report, newline="") as f:
+            lines = list(csv.reader(f))
+        self.assertEqual(lines[0], ["roll_no", "column", "value", "problem"])
+        self.assertIn(["103", "dob", "2000-02-30", "not_a_date"], lines)
+        with self.assertRaises(ValueError):  # only the audit reads an impossible dob as text
+            self.backend.fetch_page(102, 1)
+        self.assertEqual(sorted(line[0] for line in lines if line[1:] == ["email", "COPY@gmail.com", "duplicate"]
+                                or line[1:] == ["email", "copy@gmail.com", "duplicate"]), ["104", "105"])
+
+    def test_chunks_cover_table_once(self):
+        roll_nos = []
+        for after, last in self.backend.chunk_bounds(7):
+            roll_nos.extend(row[1] for row in self.backend.fetch_range(after, last))
+        all_roll_nos = self.backend._connection().execute("SELECT roll_no FROM students ORDER BY roll_no")
+        self.assertEqual(roll_nos, [roll_no for (roll_no,) in all_roll_nos])
+
+    def test_dob_limits(self):
+        today = date(2026, 1, 1)
+        rows = [student_row("A", 1, date(2023, 1, 2)), student_row("B", 2, date(1925, 12, 31)),
+                student_row("C", 3, date(2023, 1, 1)), student_row("D", 4, None)]
+        self.assertEqual([(problem[0], problem[3]) for problem in check_rows(rows, today)],
+                         [(1, "too_young"), (2, "too_old"), (4, "missing")])
+
+
+class TestChangeFeed(SQLiteTestCase):
+    def test_poll_returns_current_rows_since_last_version(self):
+        module_service.add_student(sample_record())
+        feed = ChangeFeed()
+        feed.start()
+        self.assertEqual(feed.poll(), {})
+        module_service.add_student(sample_record(roll_no="2", name="Bob"))
+        module_service.update_student(sample_record(name="Annie"))
+        module_service.update_student(sample_record(name="Anna"))
+        module_service.delete_student("2")
+        changed = feed.poll()
+        self.assertEqual(changed, {1: self.backend.search("roll_no", "1", "exact")[0], 2: None})
+        self.assertEqual(changed[1][0], "Anna")
+        self.assertEqual(feed.poll(), {})
+
+    def test_bulk_changes_are_read_in_pages(self):
+        feed = ChangeFeed(limit=10)
+        feed.start()
+        self.backend.add_many(generate_students(25))
+        self.assertEqual(sorted(feed.poll()), list(range(1, 26)))
+        self.assertEqual(feed.version, 25)
+
+    def test_bulk_changes_past_the_cap_ask_for_a_reload(self):
+        feed = ChangeFeed(limit=10, max_changes=20)
+        feed.start()
+        self.backend.add_many(generate_students(25))
+        self.assertEqual(feed.poll(), RELOAD)
+        self.assertEqual(feed.version, 25)
+        self.assertEqual(feed.poll(), {})
+
+    def test_pruned_changes_ask_for_a_reload(self):
+        feed = ChangeFeed()
+        feed.start()
+        self.backend.add_many(generate_students(5))
+        with self.backend._connection() as conn:
+            conn.execute("UPDATE students_changes SET changed_at = '2000-01-01'")
+        self.assertEqual(self.backend.prune_changes(), 4)
+        self.assertEqual((self.backend.oldest_change_version(), self.backend.change_version()), (5, 5))
+        self.assertEqual(feed.poll(), RELOAD)
+        self.backend.add(student_row("Ann", 6))
+        self.assertEqual(list(feed.poll()), [6])
+
+    def test_late_committed_version_is_picked_up(self):
+        row = student_row("Ann", 1)
+        feed = ChangeFeed(max_gap_polls=2)
+        feed.version = 0
+        with patch.object(module_service, "student_changes") as changes:
+            changes.return_value = [(1, 1, row), (3, 3, row)]
+            self.assertEqual(sorted(feed.poll()), [1, 3])
+            changes.return_value = [(2, 2, None), (3, 3, row)]
+            self.assertEqual(feed.poll(), {2: None, 3: row})
+            self.assertEqual(changes.call_args[0][0], 1)  # re-read from just before the gap
+            changes.return_value = []
+            feed.poll()
+            self.assertEqual(changes.call_args[0][0], 3)
+
+    def test_gap_that_never_fills_is_given_up(self):
+        feed = ChangeFeed(max_gap_polls=2)
+        feed.version = 0
+        with patch.object(module_service, "student_changes", return_value=[(2, 2, None)]) as changes:
+            for _ in range(3):
+                feed.poll()
+                self.assertEqual(changes.call_args[0][0], 0)
+            feed.poll()
+            self.assertEqual(changes.call_args[0][0], 2)
+
+
+class TestMySQLBackend(unittest.TestCase):
+    ROW = ("Ann", 1, "ann@gmail.com", "Female", "1234567890", "2000-01-01", "Street 1")
+
+    def tearDown(self):
+        close_pool()
+
+    @patch('mysql.connector.connect')
+    def test_operations_use_prepared_statements(self, mock_connect):
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.description = None
+        mock_cursor.rowcount = 1
+        backend = module_storage.MySQLBackend()
+        self.assertTrue(backend.add(self.ROW))
+        mock_cursor.execute.assert_called_with(module_database.STUDENT_STATEMENTS["Add"], self.ROW)
+        self.assertTrue(backend.update(self.ROW))
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertEqual(query, module_database.STUDENT_STATEMENTS["Update"])
+        self.assertEqual(params[-1], 1)
+        mock_cursor.rowcount = 0
+        self.assertFalse(backend.delete(7))
+        mock_cursor.execute.assert_called_with(module_database.STUDENT_STATEMENTS["Delete"], (7,))
+        mock_cursor.callproc.assert_not_called()
+        mock_conn.cursor.assert_called_with(prepared=True)
+
+    @patch('mysql.connector.connect')
+    def test_statements_are_prepared_once_per_connection(self, mock_connect):
+        mock_conn = mock_connect.return_value
+        mock_conn.cursor.return_value.description = None
+        mock_conn.cursor.return_value.rowcount = 1
+        backend = module_storage.MySQLBackend()
+        for roll_no in range(5):
+            backend.delete(roll_no)
+            backend.update(self.ROW)
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_conn.cursor.call_count, 2)
+
+    @patch('mysql.connector.connect')
+    def test_reads_use_prepared_statements(self, mock_connect):
+        mock_conn = mock_connect.return_value
+        mock_conn.cursor.side_effect = lambda **options: MagicMock(fetchall=MagicMock(return_value=[]))
+        find_students("name", "Jo", use_cache=False)
+        find_students("name", "Ma", use_cache=False)
+        fetch_page(after_roll_no=10, use_cache=False)
+        fetch_page(after_roll_no=20, use_cache=False)
+        self.assertEqual(mock_conn.cursor.call_count, 2)
+        for call in mock_conn.cursor.call_args_list:
+            self.assertEqual(call.kwargs, {"prepared": True})
+        search_cursor = next(iter(module_database._prepared_cursors[mock_conn].values()))[1]
+        first, second = (call[0][0] for call in search_cursor.execute.call_args_list)
+        self.assertIs(first, second)  # the driver only skips re-preparing the identical string
+
+    @patch('mysql.connector.connect')
+    def test_least_recently_used_statement_closed(self, mock_connect):
+        mock_conn = mock_connect.return_value
+        cursors = []
+        mock_conn.cursor.side_effect = lambda **options: cursors.append(MagicMock()) or cursors[-1]
+        with patch.object(module_database, "PREPARED_STATEMENTS_PER_CONNECTION", 2):
+            for column in ("name", "email", "name", "contact"):
+                find_students(column, "x", use_cache=False)
+        self.assertEqual(len(cursors), 3)
+        cursors[1].close.assert_called_once()  # email: the least recently used
+        cursors[0].close.assert_not_called()
+
+    def test_transient_errors_classified_by_errno(self):
+        backend = module_storage.MySQLBackend()
+        # The C extension reports a lost server as a plain DatabaseError
+        self.assertTrue(backend.is_transient(mysql.connector.DatabaseError("Lost connection", errno=2013)))
+        self.assertTrue(backend.is_transient(mysql.connector.InterfaceError("Can't connect", errno=2003)))
+        self.assertTrue(backend.is_transient(mysql.connector.errors.PoolError("Timed out")))
+        self.assertFalse(backend.is_transient(mysql.connector.IntegrityError("Duplicate entry", errno=1062)))
+        self.assertFalse(backend.is_transient(mysql.connector.DatabaseError("Data too long", errno=1406)))
+
+    @patch('mysql.connector.connect')
+    def test_add_of_taken_roll_no_returns_false(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.execute.side_effect = mysql.connector.IntegrityError(
+            "Duplicate entry", errno=module_database.DUPLICATE_KEY_ERRNO)
+        self.assertFalse(module_storage.MySQLBackend().add(self.ROW))
+        mock_cursor.execute.side_effect = mysql.connector.IntegrityError("Bad value", errno=1048)
+        with self.assertRaises(mysql.connector.IntegrityError):
+            module_storage.MySQLBackend().add(self.ROW)
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(list(generate_students(50, seed=7)), list(generate_students(50, seed=7)))
+        self.assertNotEqual(list(generate_students(50, seed=7)), list(generate_students(50, seed=8)))
+
+    def test_rows_are_valid(self):
+        rows = list(generate_students(500, start_roll_no=100))
+        self.assertEqual([row[1] for row in rows], list(range(100, 600)))
+        for row in rows:
+            record = dict(zip(module_database.STUDENT_COLUMNS, map(str, row)))
+            self.assertEqual(module_database.validate_student_record(record), row)
+        self.assertTrue(all(validate_emails([row[2] for row in rows])[0]))
+
+    def test_add_many_skips_taken_roll_numbers(self):
+        backend = module_storage.SQLiteBackend(os.path.join(tempfile.mkdtemp(), "students.db"))
+        backend.setup()
+        self.assertEqual(backend.add_many(generate_students(25), batch_size=10), 25)
+        self.assertEqual(backend.add_many(generate_students(10, seed=1, start_roll_no=21), batch_size=4), 5)
+        self.assertEqual(len(backend.get_all()), 30)
+        backend.close()
+
+
+class TestLiveSearch(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for roll_no, name in enumerate(["John Smith", "Joan Baker", "Johanna Lee", "Mary Jones"], start=1):
+            module_service.add_student(sample_record(name=name, roll_no=str(roll_no), email=f"s{roll_no}@gmail.com"))
+        self.root = FakeRoot()
+        self.runner = BackgroundRunner(self.root, max_workers=1)
+        self.results = []
+        self.empty = []
+        self.search = LiveSearch(self.root, self.runner, on_results=self.results.append,
+                                 on_empty=lambda: self.empty.append(True))
+
+    def tearDown(self):
+        self.runner.shutdown()
+        super().tearDown()
+
+    def type(self, column, *keystrokes):
+        for text in keystrokes:
+            self.search.schedule(column, text)
+        self.root.pump(self.runner)
+
+    def names(self):
+        return [row[0] for row in self.results[-1]]
+
+    def test_keystrokes_are_debounced(self):
+        self.type("name", "J", "Jo", "Joh")
+        self.assertEqual(len(self.results), 1)
+        self.assertEqual(self.search.round_trips, 1)
+        self.assertEqual(self.names(), ["Johanna Lee", "John Smith"])
+
+    def test_extending_query_narrows_locally(self):
+        self.type("name", "Jo")
+        self.type("name", "Joh")
+        self.type("name", "John")
+        self.assertEqual(self.search.round_trips, 1)
+        self.assertEqual(self.search.narrowed, 2)
+        self.assertEqual(self.names(), ["John Smith"])
+
+    def test_narrowing_matches_database(self):
+        self.type("email", "s")
+        self.type("email", "s2")
+        narrowed = self.results[-1]
+        self.assertEqual(narrowed, module_service.search_students("email", "s2"))
+
+    def test_new_prefix_queries_database(self):
+        self.type("name", "Joh")
+        self.type("name", "Mar")
+        self.assertEqual(self.search.round_trips, 2)
+        self.assertEqual(self.names(), ["Mary Jones"])
+
+    def test_truncated_results_are_not_narrowed(self):
+        self.search.limit = 2
+        self.type("name", "Jo")
+        self.type("name", "Joa")
+        self.assertEqual(self.search.round_trips, 2)
+        self.assertEqual(self.names(), ["Joan Baker"])
+
+    def test_reset_after_write(self):
+        self.type("name", "Jo")
+        module_service.add_student(sample_record(name="Jonah Hill", roll_no="9", email="s9@gmail.com"))
+        self.search.reset()
+        self.type("name", "Jon")
+        self.assertEqual(self.names(), ["Jonah Hill", "Mary Jones"])
+
+    def test_cleared_query_shows_all(self):
+        self.type("name", "Jo", "")
+        self.assertEqual(self.empty, [True])
+        self.assertEqual(self.results, [])
+
+
+class TestHeadlessServer(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = make_server(port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def request(self, method, path, body=None):
+        self.conn.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_client_threads_do_not_keep_connections(self):
+        for _ in range(50):
+            conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+            conn.request("GET", "/students")
+            self.assertEqual(conn.getresponse().status, 200)
+            conn.close()
+        for thread in threading.enumerate():
+            if "process_request_thread" in thread.name:  # the server's per-client threads
+                thread.join(1)
+        self.assertLess(len(self.backend._connections), 5)
+
+    def test_add_then_search(self):
+        self.assertEqual(self.request("POST", "/students", sample_record())[0], 201)
+        status, body = self.request("GET", "/students/search?column=name&q=An")
+        self.assertEqual(status, 200)
+        self.assertEqual(body[0]["roll_no"], 1)
+        self.assertEqual(body[0]["dob"], "2000-01-01")
+
+    def test_add_validation_error(self):
+        status, body = self.request("POST", "/students", {"name": "Ann"})
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error"], "All fields are required")
+
+    def test_update_and_delete(self):
+        self.request("POST", "/students", sample_record())
+        self.assertEqual(self.request("PUT", "/students/1", sample_record(name="Annie"))[0], 200)
+        self.assertEqual(self.request("GET", "/students")[1][0]["name"], "Annie")
+        self.assertEqual(self.request("DELETE", "/students/1")[0], 200)
+        self.assertEqual(self.request("DELETE", "/students/1")[0], 404)
+
+    def test_unknown_route(self):
+        self.assertEqual(self.request("GET", "/nope")[0], 404)
+
+    def test_sorted_filtered_page(self):
+        for roll_no, name in ((1, "Cy"), (2, "Al"), (3, "Bo")):
+            self.request("POST", "/students", sample_record(roll_no=str(roll_no), name=name))
+        status, body = self.request("GET", "/students?sort=name&after_value=Al&after=2&gender=Female&limit=5")
+        self.assertEqual(status, 200)
+        self.assertEqual([student["name"] for student in body], ["Bo", "Cy"])
+        self.assertEqual(self.request("GET", "/students?sort=name&after=2")[0], 400)
+        status, body = self.request("GET", "/students?sort=name&after_null=1&after=9")
+        self.assertEqual([student["name"] for student in body], ["Al", "Bo", "Cy"])
+
+    def test_changes(self):
+        self.request("POST", "/students", sample_record())
+        self.request("DELETE", "/students/1")
+        status, body = self.request("GET", "/changes?since=1")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, [{"version": 2, "roll_no": 1, "student": None}])
+        self.assertEqual(self.request("GET", "/changes")[1][0]["version"], 1)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics(enabled=True, slow_query_threshold=None)
+
+    def tearDown(self):
+        metrics.enabled = False
+        metrics.reset()
+        close_pool()
+
+    def test_disabled_records_nothing(self):
+        self.metrics.enabled = False
+        with self.metrics.timed("Add") as timer:
+            timer.rows = 1
+        self.assertEqual(self.metrics.snapshot()["actions"], {})
+
+    def test_counts_rows_and_errors(self):
+        with self.metrics.timed("Search") as timer:
+            timer.rows = 3
+        with self.assertRaises(RuntimeError):
+            with self.metrics.timed("Search"):
+                raise RuntimeError("lost connection")
+        search = self.metrics.snapshot()["actions"]["Search"]
+        self.assertEqual((search["count"], search["rows"], search["errors"]), (2, 3, 1))
+
+    def test_percentiles(self):
+        for i in range(100):
+            self.metrics.record("GetAll", 3.0 if i % 10 == 0 else 0.002)
+        stats = self.metrics.snapshot()["actions"]["GetAll"]
+        self.assertTrue(1 <= stats["p50_ms"] <= 2.5)
+        self.assertTrue(2500 <= stats["p95_ms"] <= 5000)
+        self.assertTrue(2500 <= stats["p99_ms"] <= 5000)
+
+    def test_slow_query_log(self):
+        self.metrics.slow_query_threshold = 0.1
+        with self.assertLogs("students.slow_queries") as logs:
+            self.metrics.record("Search", 0.25, rows=2, detail="name substring 'Jo'")
+            self.metrics.record("Search", 0.01)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("slow Search: 250.0 ms, 2 rows: name substring 'Jo'", logs.output[0])
+
+    def test_prometheus_file(self):
+        self.metrics.record("Add", 0.003, rows=1)
+        self.metrics.record_acquire(0.0001)
+        path = os.path.join(tempfile.mkdtemp(), "students.prom")
+        self.metrics.write_prometheus(path)
+        with open(path) as f:
+            text = f.read()
+        self.assertIn('students_db_call_seconds_bucket{action="Add",le="0.005"} 1', text)
+        self.assertIn('students_db_call_seconds_count{action="Add"} 1', text)
+        self.assertIn('students_db_rows_total{action="Add"} 1', text)
+        self.assertIn("students_db_connection_acquire_seconds_count 1", text)
+
+    @patch('mysql.connector.connect')
+    def test_stored_procedure_calls_are_recorded(self, mock_connect):
+        result = MagicMock(rowcount=1)
+        mock_connect.return_value.cursor.return_value.stored_results.return_value = [result]
+        metrics.enabled = True
+        execute_stored_procedure('ManageStudents', ('Delete', None, 7, None, None, None, None, None, None, None))
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["actions"]["Delete"]["count"], 1)
+        self.assertEqual(snapshot["actions"]["Delete"]["rows"], 1)
+        self.assertEqual(snapshot["connection_acquire"]["count"], 1)
+
+
+class TestAsyncDatabase(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        module_async_database._pool = None
+
+    def mock_pool(self, rows):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        cursor.callproc = AsyncMock()
+        cursor.fetchall = AsyncMock(return_value=rows)
+        cursor.nextset = AsyncMock(return_value=None)
+        cursor.__aenter__ = AsyncMock(return_value=cursor)
+        cursor.__aexit__ = AsyncMock(return_value=False)
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        conn.commit = AsyncMock()
+        acquire = MagicMock()
+        acquire.__aenter__ = AsyncMock(return_value=conn)
+        acquire.__aexit__ = AsyncMock(return_value=False)
+        pool = MagicMock()
+        pool.acquire.return_value = acquire
+        return pool, cursor
+
+    @unittest.skipIf(module_async_database.aiomysql is None, "aiomysql not installed")
+    async def test_concurrent_callers_share_one_pool(self):
+        pool, cursor = self.mock_pool([("Ann", 1)])
+        with patch('aiomysql.create_pool', AsyncMock(return_value=pool)) as mock_create:
+            results = await asyncio.gather(*(module_async_database.async_fetch_page(None, 1) for _ in range(10)))
+        mock_create.assert_awaited_once()
+        self.assertTrue(mock_create.await_args.kwargs["autocommit"])
+        self.assertEqual(results, [[("Ann", 1)]] * 10)
+
+    @unittest.skipIf(module_async_database.aiomysql is None, "aiomysql not installed")
+    async def test_writes_use_the_sync_statements(self):
+        pool, cursor = self.mock_pool([])
+        cursor.execute.return_value = 1
+        row = ("Ann", 1, "ann@gmail.com", "Female", "1234567890", date(2000, 1, 1), "Street 1")
+        with patch('aiomysql.create_pool', AsyncMock(return_value=pool)):
+            self.assertTrue(await module_async_database.async_insert_student(row))
+            cursor.execute.assert_awaited_with(module_database.STUDENT_STATEMENTS["Add"], row)
+            cursor.execute.side_effect = module_async_database.aiomysql.IntegrityError(1062, "Duplicate entry")
+            self.assertFalse(await module_async_database.async_insert_student(row))
+        cursor.callproc.assert_not_called()
+
+    @unittest.skipIf(module_async_database.aiomysql is None, "aiomysql not installed")
+    async def test_stored_procedure_reads_result_sets(self):
+        pool, cursor = self.mock_pool([("Ann", 1)])
+        cursor.description = (("name",),)
+        with patch('aiomysql.create_pool', AsyncMock(return_value=pool)):
+            results = await module_async_database.async_execute_stored_procedure(
+                "ManageStudents", ('GetAll', None, None, None, None, None, None, None, None, None))
+        self.assertEqual(results, [[("Ann", 1)]])
+        cursor.callproc.assert_awaited_once()
+
 
 class TestValidationModule(unittest.TestCase):
     def test_validate_email_valid(self):
@@ -84,6 +1341,40 @@ class TestValidationModule(unittest.TestCase):
         self.assertFalse(validate_contact("abcd12345"))
 
 
+class TestBatchValidation(unittest.TestCase):
+    EMAILS = ["test@gmail.com", "user@yahoo.com", "@yahoo.edu", "@gmail.com", "a@outlook.org",
+              "a@hotmail.com", "invalid-email", "missinguser.com", "x@gmail.com\n", "a@b@gmail.com"]
+    CONTACTS = ["1234567890", "0987654321", "123", "abcd12345", "12345 67890", "１２３４５６７８９０"]
+
+    def test_emails_agree_with_scalar(self):
+        mask, reasons = validate_emails(self.EMAILS)
+        self.assertEqual(mask, [validate_email(email) for email in self.EMAILS])
+        self.assertEqual(reasons[:2], [None, None])
+        self.assertEqual(reasons[4:8], ["bad_suffix", "bad_domain", "missing_at", "missing_at"])
+
+    def test_edu_without_at_reported_not_raised(self):
+        with self.assertRaises(ValueError):
+            validate_email("student.edu")
+        self.assertEqual(validate_emails(["student.edu"]), ([False], ["missing_at"]))
+
+    def test_contacts_agree_with_scalar(self):
+        mask, reasons = validate_contacts(self.CONTACTS)
+        self.assertEqual(mask, [validate_contact(no) for no in self.CONTACTS])
+        self.assertEqual(reasons[2:5], ["too_short", "too_short", "not_digits"])
+
+    def test_numpy_arrays(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("numpy not installed")
+        mask, reasons = validate_emails(np.array(self.EMAILS))
+        self.assertEqual(mask.tolist(), validate_emails(self.EMAILS)[0])
+        self.assertEqual(reasons, validate_emails(self.EMAILS)[1])
+        mask, reasons = validate_contacts(np.array(self.CONTACTS))
+        self.assertEqual((mask.tolist(), reasons), validate_contacts(self.CONTACTS))
+
+
+@unittest.skipIf(GUI_UNAVAILABLE, GUI_UNAVAILABLE)
 class TestAddStudent(unittest.TestCase):
     def setUp(self):
         self.root = Tk()
@@ -124,6 +1415,7 @@ class TestAddStudent(unittest.TestCase):
         mock_messagebox.showerror.assert_called_once_with
 
 
+@unittest.skipIf(GUI_UNAVAILABLE, GUI_UNAVAILABLE)
 class TestDeleteStudent(unittest.TestCase):
     def setUp(self):
         self.root = Tk()
@@ -152,6 +1444,7 @@ class TestDeleteStudent(unittest.TestCase):
         mock_messagebox.showerror.assert_called_once_with("Error", "No student selected")
 
 
+@unittest.skipIf(GUI_UNAVAILABLE, GUI_UNAVAILABLE)
 class TestUpdateStudent(unittest.TestCase):
     def setUp(self):
         self.root = Tk()
@@ -181,6 +1474,7 @@ class TestUpdateStudent(unittest.TestCase):
         mock_messagebox.showerror.assert_called_once_with("Error", "No fields are selected")
 
 
+@unittest.skipIf(GUI_UNAVAILABLE, GUI_UNAVAILABLE)
 class TestClearFields(unittest.TestCase):
     def setUp(self):
         # Set up a basic Tkinter window and variables